@@ -1,11 +1,18 @@
 """Authentication and authorization rules."""
 
+import hashlib
+import threading
+from collections.abc import Callable
 from logging import Logger
 from typing import Annotated
 
-import requests
+import httpx
+import jwt
+import orjson
+from cachetools import TLRUCache, TTLCache
 from fastapi import HTTPException, Request, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from flaat.access_tokens import AccessTokenInfo
 from flaat.exceptions import FlaatUnauthenticated
 from flaat.fastapi import Flaat
 from flaat.user_infos import UserInfos
@@ -15,14 +22,71 @@ from app.config import (
     AuthorizationMethodsEnum,
     Settings,
     SettingsDep,
+    get_settings,
 )
 
 IDP_TIMEOUT = 5
 OPA_TIMEOUT = 5
+OPA_MAX_CONNECTIONS = 100
+OPA_MAX_KEEPALIVE_CONNECTIONS = 40
+OPA_KEEPALIVE_EXPIRY = 30
+USER_INFOS_CACHE_SIZE = 10000
+USER_INFOS_CACHE_TTL = 30
+OPA_CACHE_SIZE = 20000
+OPA_CACHE_KEY_LEN = 16
+JWKS_LIFESPAN = 3600
+JWKS_FAILURE_TTL = 60
+JWKS_FAILURES_CACHE_SIZE = 100
+JWT_ALGORITHMS = ["RS256", "ES256"]
 
 flaat = Flaat()
 
 
+def hash_token(token: str) -> bytes:
+    """Return the SHA-256 digest of an access token.
+
+    Caches use the digest as key so that raw access tokens are never kept in memory
+    longer than the request lifetime.
+
+    Args:
+        token: The raw access token.
+
+    Returns:
+        bytes: The SHA-256 digest of the token.
+
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+
+def user_infos_time_to_use(key: bytes, user_infos: UserInfos, now: float) -> float:
+    """Compute the expiration time of a cached UserInfos instance.
+
+    Entries live at most USER_INFOS_CACHE_TTL seconds and never outlive the access
+    token they were retrieved from.
+
+    Args:
+        key: The cache key (unused).
+        user_infos: The user information to cache.
+        now: The current cache timer value.
+
+    Returns:
+        float: The timer value after which the entry expires.
+
+    """
+    ttl = USER_INFOS_CACHE_TTL
+    valid_for_secs = user_infos.valid_for_secs
+    if valid_for_secs is not None:
+        ttl = min(ttl, valid_for_secs)
+    return now + ttl
+
+
+user_infos_cache = TLRUCache(maxsize=USER_INFOS_CACHE_SIZE, ttu=user_infos_time_to_use)
+user_infos_cache_lock = threading.Lock()
+jwks_clients: dict[str, jwt.PyJWKClient] = {}
+jwks_failures = TTLCache(maxsize=JWKS_FAILURES_CACHE_SIZE, ttl=JWKS_FAILURE_TTL)
+jwks_clients_lock = threading.Lock()
+
+
 def configure_flaat(settings: Settings, logger: Logger) -> None:
     """Configure the Flaat authentication and authorization system for the application.
 
@@ -51,6 +115,54 @@ def configure_flaat(settings: Settings, logger: Logger) -> None:
     flaat.set_trusted_OP_list([str(i) for i in settings.TRUSTED_IDP_LIST])
 
 
+def create_opa_client(settings: Settings) -> httpx.AsyncClient:
+    """Create the HTTP client used to send authorization requests to OPA.
+
+    The client keeps a pool of keep-alive connections so that concurrent requests
+    reuse already open sockets instead of performing a new TCP/TLS handshake for each
+    authorization check. When enabled, HTTP/2 multiplexes concurrent requests over a
+    single connection. When OPA runs as a sidecar exposing a Unix domain socket,
+    requests are sent through the socket, skipping the TCP stack; the OPA URL is
+    still used to build the request path and Host header. It must be created at
+    application startup and closed on shutdown.
+
+    Args:
+        settings: The application settings instance.
+
+    Returns:
+        httpx.AsyncClient: The pooled asynchronous HTTP client.
+
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=settings.OPA_HTTP2,
+        uds=settings.OPA_UDS_PATH,
+        limits=httpx.Limits(
+            max_connections=OPA_MAX_CONNECTIONS,
+            max_keepalive_connections=OPA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OPA_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(OPA_TIMEOUT))
+
+
+def create_opa_cache(settings: Settings) -> TTLCache | None:
+    """Create the cache storing the OPA authorization decisions.
+
+    Decisions are stored for OPA_CACHE_TTL seconds. Within that interval a policy or
+    user change on the OPA side does not affect already cached decisions.
+
+    Args:
+        settings: The application settings instance.
+
+    Returns:
+        TTLCache | None: The decisions cache or None when caching is disabled.
+
+    """
+    if settings.OPA_CACHE_TTL == 0:
+        return None
+    return TTLCache(maxsize=OPA_CACHE_SIZE, ttl=settings.OPA_CACHE_TTL)
+
+
 security = HTTPBearer()
 
 HttpAuthzCredsDep = Annotated[HTTPAuthorizationCredentials, Security(security)]
@@ -61,6 +173,10 @@ def check_flaat_authentication(
 ) -> UserInfos:
     """Verify that the provided access token belongs to a trusted issuer.
 
+    Retrieved user information are cached, using the token hash as key, until the
+    token expires or at most for USER_INFOS_CACHE_TTL seconds. This avoids verifying
+    the same token and contacting the identity provider on every request.
+
     Args:
         authz_creds: HTTP authorization credentials extracted from the request.
         logger (Logger): Logger instance for logging authorization steps.
@@ -73,90 +189,352 @@ def check_flaat_authentication(
 
     """
     logger.debug("Authentication through flaat")
+    key = hash_token(authz_creds.credentials)
+    with user_infos_cache_lock:
+        user_infos = user_infos_cache.get(key)
+    if user_infos is not None:
+        logger.debug("User infos retrieved from cache")
+        return user_infos
     try:
-        return flaat.get_user_infos_from_access_token(authz_creds.credentials)
+        user_infos = flaat.get_user_infos_from_access_token(authz_creds.credentials)
     except FlaatUnauthenticated as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail=e.render()
         ) from e
+    if user_infos is not None:
+        with user_infos_cache_lock:
+            user_infos_cache[key] = user_infos
+    return user_infos
 
 
-def check_authentication(
-    request: Request, authz_creds: HttpAuthzCredsDep, settings: SettingsDep
-) -> UserInfos | None:
-    """Check user authentication.
+def get_jwks_client(
+    issuer: str, settings: Settings, logger: Logger
+) -> jwt.PyJWKClient | None:
+    """Return the client retrieving the signing keys of a trusted issuer.
 
-    Depending on the authentication mode specified in the settings, this function
-    delegates the authentication process to the appropriate handler. If the
-    authentication mode is set to 'local', it uses the Flaat authentication mechanism.
+    Clients are created on first use, discovering the JWKS URI from the issuer's
+    OpenID configuration, and then reused. Each client caches the issuer keys for
+    JWKS_LIFESPAN seconds. When the discovery fails, the issuer is skipped for
+    JWKS_FAILURE_TTL seconds, so requests do not wait for an unreachable issuer each
+    time. The lookup is blocking: it runs in the threadpool where FastAPI executes
+    the sync authentication dependencies, off the event loop.
 
     Args:
-        request (Request): The current FastAPI request object.
-        authz_creds (HttpAuthzCredsDep): The authorization credentials dependency
-            required for authentication.
-        settings (SettingsDep): The application settings dependency containing
-            authentication configuration.
+        issuer: The issuer of the access token.
+        settings: The application settings instance.
+        logger: Logger instance for logging authentication steps.
 
     Returns:
-        UserInfos: Information about the authenticated user.
+        jwt.PyJWKClient | None: The JWKS client or None if the issuer is not trusted or
+            its configuration can't be retrieved.
+
+    """
+    issuer = issuer.rstrip("/")
+    with jwks_clients_lock:
+        jwks_client = jwks_clients.get(issuer)
+        failed = issuer in jwks_failures
+    if jwks_client is not None:
+        return jwks_client
+    if issuer not in {str(i).rstrip("/") for i in settings.TRUSTED_IDP_LIST}:
+        return None
+    if failed:
+        logger.debug("Skipping issuer %s after a recent JWKS failure", issuer)
+        return None
+    try:
+        resp = httpx.get(
+            f"{issuer}/.well-known/openid-configuration", timeout=IDP_TIMEOUT
+        )
+        resp.raise_for_status()
+        jwks_uri = resp.json()["jwks_uri"]
+    except (httpx.HTTPError, ValueError, KeyError) as e:
+        logger.warning("Unable to retrieve the JWKS URI of issuer %s: %s", issuer, e)
+        forget_jwks_client(issuer)
+        return None
+    jwks_client = jwt.PyJWKClient(
+        jwks_uri, cache_keys=True, lifespan=JWKS_LIFESPAN, timeout=IDP_TIMEOUT
+    )
+    with jwks_clients_lock:
+        return jwks_clients.setdefault(issuer, jwks_client)
+
+
+def forget_jwks_client(issuer: str) -> None:
+    """Drop the JWKS client of an issuer and skip it for JWKS_FAILURE_TTL seconds.
+
+    Args:
+        issuer: The issuer whose configuration or signing keys can't be retrieved.
+
+    """
+    issuer = issuer.rstrip("/")
+    with jwks_clients_lock:
+        jwks_clients.pop(issuer, None)
+        jwks_failures[issuer] = True
+
+
+def check_jwt_authentication(
+    authz_creds: HTTPAuthorizationCredentials, settings: Settings, logger: Logger
+) -> UserInfos:
+    """Validate the access token offline using the issuer signing keys.
+
+    The token signature and its expiration are verified locally, without contacting
+    the identity provider, and the user information are built from the token claims.
+    The token is parsed once without verification, to read the issuer and the key
+    ID, and decoded once with verification. The audience is verified only when the
+    JWT_AUDIENCE setting is defined. The verified claims are stored in the
+    returned UserInfos so later checks never decode the token again.
+    Tokens which are not JWTs or whose issuer is not trusted are delegated to flaat.
+    Retrieved user information are cached as in check_flaat_authentication.
+
+    Args:
+        authz_creds: HTTP authorization credentials extracted from the request.
+        settings: The application settings instance.
+        logger (Logger): Logger instance for logging authentication steps.
+
+    Returns:
+        UserInfos: The user information extracted from the access token.
 
     Raises:
-        Exception: If authentication fails or the authentication mode is unsupported.
+        HTTPException: If the token is not valid or not from a trusted issuer.
 
     """
-    if settings.AUTHN_MODE == AuthenticationMethodsEnum.local:
-        return check_flaat_authentication(
-            authz_creds=authz_creds, logger=request.state.logger
+    token = authz_creds.credentials
+    key = hash_token(token)
+    with user_infos_cache_lock:
+        user_infos = user_infos_cache.get(key)
+    if user_infos is not None:
+        logger.debug("User infos retrieved from cache")
+        return user_infos
+    try:
+        unverified = jwt.api_jwt.decode_complete(
+            token, options={"verify_signature": False}
         )
+    except jwt.PyJWTError:
+        unverified = None
+    jwks_client = None
+    if unverified is not None and "iss" in unverified["payload"]:
+        jwks_client = get_jwks_client(unverified["payload"]["iss"], settings, logger)
+    if jwks_client is None:
+        return check_flaat_authentication(authz_creds=authz_creds, logger=logger)
+
+    logger.debug("Authentication through offline JWT validation")
+    try:
+        # Use the already parsed header instead of letting PyJWKClient decode the
+        # token again.
+        kid = unverified["header"].get("kid")
+        if kid is not None:
+            signing_key = jwks_client.get_signing_key(kid)
+        else:
+            signing_key = jwks_client.get_signing_key_from_jwt(token)
+        complete_decode = jwt.api_jwt.decode_complete(
+            token,
+            key=signing_key.key,
+            algorithms=JWT_ALGORITHMS,
+            audience=settings.JWT_AUDIENCE,
+            options={
+                "verify_aud": settings.JWT_AUDIENCE is not None,
+                "require": ["exp", "iss", "sub"],
+            },
+        )
+    except jwt.PyJWKClientConnectionError as e:
+        issuer = unverified["payload"]["iss"]
+        logger.warning(
+            "Unable to retrieve the signing keys of issuer %s: %s", issuer, e
+        )
+        forget_jwks_client(issuer)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Could not verify JWT: {e}",
+        ) from e
+    except jwt.PyJWTError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Could not verify JWT: {e}",
+        ) from e
+    user_infos = UserInfos(
+        access_token_info=AccessTokenInfo(
+            complete_decode,
+            verification={"algorithm": complete_decode["header"].get("alg", "")},
+        ),
+        user_info=dict(complete_decode["payload"]),
+        introspection_info=None,
+    )
+    with user_infos_cache_lock:
+        user_infos_cache[key] = user_infos
+    return user_infos
+
+
+def flaat_authentication(request: Request, authz_creds: HttpAuthzCredsDep) -> UserInfos:
+    """Dependency authenticating users through flaat.
+
+    Args:
+        request: The current FastAPI request object (provides logger in state).
+        authz_creds: The authorization credentials of the current request.
+
+    Returns:
+        UserInfos: The user information extracted from the access token.
+
+    """
+    return check_flaat_authentication(
+        authz_creds=authz_creds, logger=request.state.logger
+    )
+
+
+def jwt_authentication(
+    request: Request, authz_creds: HttpAuthzCredsDep, settings: SettingsDep
+) -> UserInfos:
+    """Dependency authenticating users through offline JWT validation.
+
+    Args:
+        request: The current FastAPI request object (provides logger in state).
+        authz_creds: The authorization credentials of the current request.
+        settings: The application settings dependency.
+
+    Returns:
+        UserInfos: The user information extracted from the access token.
+
+    """
+    return check_jwt_authentication(
+        authz_creds=authz_creds, settings=settings, logger=request.state.logger
+    )
+
+
+def no_authentication(authz_creds: HttpAuthzCredsDep) -> None:
+    """Dependency used when authentication is disabled.
+
+    The bearer token is still required, as with the other authentication modes.
+
+    Args:
+        authz_creds: The authorization credentials of the current request.
+
+    """
     return None
 
 
+def get_authentication_dependency(settings: Settings) -> Callable:
+    """Return the authentication dependency matching the configured mode.
+
+    Args:
+        settings: The application settings instance.
+
+    Returns:
+        Callable: flaat_authentication for the 'local' mode, jwt_authentication for the
+            'jwt' mode, no_authentication when authentication is disabled.
+
+    """
+    match settings.AUTHN_MODE:
+        case AuthenticationMethodsEnum.local:
+            return flaat_authentication
+        case AuthenticationMethodsEnum.jwt:
+            return jwt_authentication
+        case _:
+            return no_authentication
+
+
+# The authentication and authorization modes can't change while the application runs,
+# so the dependencies implementing them are chosen once, when the endpoints using them
+# are declared, instead of dispatching on the modes at every request.
+check_authentication = get_authentication_dependency(get_settings())
+
 AuthenticationDep = Annotated[UserInfos, Security(check_authentication)]
 
 
 async def check_opa_authorization(
-    *, request: Request, user_infos: UserInfos, settings: Settings, logger: Logger
+    *,
+    request: Request,
+    token: str,
+    user_infos: UserInfos,
+    settings: Settings,
+    logger: Logger,
 ) -> None:
     """Check user authorization via Open Policy Agent (OPA).
 
-    Send the request data to the OPA server.
+    Send the request data to the OPA server using the shared HTTP client stored in the
+    request state. Allow and deny decisions are stored in the OPA cache, when present
+    in the request state, using the token hash, the method, the path and the presence
+    of a body as key. Errors are never cached.
 
     Args:
+        request (Request): The incoming request object containing user information, the
+            OPA HTTP client and the OPA decisions cache.
+        token (str): The access token of the current request.
         user_infos (UserInfos): The authenticated user information.
-        request (Request): The incoming request object containing user information.
+        settings (Settings): Application settings containing OPA server configuration.
+        logger (Logger): Logger instance for logging authorization steps.
+
+    Raises:
+        HTTPException: If the user is not authorized or the OPA server returns a bad
+            request, internal error, unexpected status code, or is unreachable.
+
+    """
+    logger.debug("Authorization through OPA")
+    # Check the body presence from the headers to avoid reading the whole body.
+    # A malformed content-length is treated as a body being present.
+    try:
+        has_body = int(request.headers.get("content-length", "0")) != 0
+    except ValueError:
+        has_body = True
+    has_body = has_body or "transfer-encoding" in request.headers
+    cache = request.state.opa_cache
+    key = (
+        hash_token(token)[:OPA_CACHE_KEY_LEN],
+        request.method,
+        request.url.path,
+        has_body,
+    )
+    allow = None if cache is None else cache.get(key)
+    if allow is not None:
+        logger.debug("OPA decision retrieved from cache")
+    else:
+        allow = await send_opa_request(
+            request=request,
+            data={
+                "input": {
+                    "user_info": user_infos.user_info,
+                    "path": request.url.path,
+                    "method": request.method,
+                    "has_body": has_body,
+                }
+            },
+            settings=settings,
+            logger=logger,
+        )
+        if cache is not None:
+            cache[key] = allow
+    if not allow:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unauthorized to perform this operation",
+        )
+
+
+async def send_opa_request(
+    *, request: Request, data: dict, settings: Settings, logger: Logger
+) -> bool:
+    """Send the authorization input to OPA and return its decision.
+
+    Args:
+        request (Request): The incoming request object containing the OPA HTTP client.
+        data (dict): The OPA input document.
         settings (Settings): Application settings containing OPA server configuration.
         logger (Logger): Logger instance for logging authorization steps.
 
     Returns:
-        bool: True if the user is authorized to perform the operation on the endpoint.
+        bool: True if OPA allows the operation.
 
     Raises:
-        ConnectionRefusedError: If the OPA server returns a bad request, internal error,
+        HTTPException: If the OPA server returns a bad request, internal error,
             unexpected status code, or is unreachable.
 
     """
-    logger.debug("Authorization through OPA")
-    body = await request.body()
-    data = {
-        "input": {
-            "user_info": user_infos.user_info,
-            "path": request.url.path,
-            "method": request.method,
-            "has_body": len(body) > 0,
-        }
-    }
     try:
         logger.debug("Sending user's data to OPA")
-        resp = requests.post(settings.OPA_AUTHZ_URL, json=data, timeout=OPA_TIMEOUT)
+        resp = await request.state.opa_client.post(
+            str(settings.OPA_AUTHZ_URL),
+            content=orjson.dumps(data),
+            headers={"Content-Type": "application/json"},
+        )
         match resp.status_code:
             case status.HTTP_200_OK:
-                resp = resp.json().get("result", {"allow": False})
-                if resp["allow"]:
-                    return
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Unauthorized to perform this operation",
-                )
+                return bool(resp.json().get("result", {}).get("allow", False))
             case status.HTTP_400_BAD_REQUEST:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -173,34 +551,65 @@ async def check_opa_authorization(
                     detail="Authentication failed: OPA unexpected response code "
                     f"'{resp.status_code}'",
                 )
-    except (requests.Timeout, ConnectionError) as e:
+    except (httpx.TimeoutException, httpx.TransportError) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Authentication failed: OPA server is not reachable",
         ) from e
 
 
-async def check_authorization(
-    request: Request, user_infos: AuthenticationDep, settings: SettingsDep
+async def opa_authorization(
+    request: Request,
+    authz_creds: HttpAuthzCredsDep,
+    user_infos: AuthenticationDep,
+    settings: SettingsDep,
 ) -> None:
-    """Dependency to check user permissions.
-
-    If the authorization mode is set to 'opa', it uses the OPA authorization mechanism.
+    """Dependency authorizing users through OPA.
 
     Args:
         request: The current FastAPI request object (provides logger in state).
+        authz_creds: The authorization credentials of the current request.
         user_infos: The authenticated user information.
         settings: The application settings dependency.
 
-    Raises:
-        HTTPException: If the user does not have user-level access.
+    """
+    await check_opa_authorization(
+        token=authz_creds.credentials,
+        user_infos=user_infos,
+        request=request,
+        settings=settings,
+        logger=request.state.logger,
+    )
+
+
+async def no_authorization(user_infos: AuthenticationDep) -> None:
+    """Dependency used when authorization is disabled.
+
+    Users must still be authenticated, as with the other authorization modes.
+
+    Args:
+        user_infos: The authenticated user information.
 
     """
-    if settings.AUTHZ_MODE == AuthorizationMethodsEnum.opa:
-        return await check_opa_authorization(
-            user_infos=user_infos,
-            request=request,
-            settings=settings,
-            logger=request.state.logger,
-        )
     return None
+
+
+def get_authorization_dependency(settings: Settings) -> Callable:
+    """Return the authorization dependency matching the configured mode.
+
+    Args:
+        settings: The application settings instance.
+
+    Returns:
+        Callable: opa_authorization for the 'opa' mode, no_authorization when
+            authorization is disabled.
+
+    """
+    match settings.AUTHZ_MODE:
+        case AuthorizationMethodsEnum.opa:
+            return opa_authorization
+        case _:
+            return no_authorization
+
+
+check_authorization = get_authorization_dependency(get_settings())
@@ -17,6 +17,7 @@ class AuthenticationMethodsEnum(str, Enum):
     """Enumeration of supported authentication methods."""
 
     local = "local"
+    jwt = "jwt"
 
 
 class AuthorizationMethodsEnum(str, Enum):
@@ -84,6 +85,24 @@ class Settings(BaseSettings):
             description="DB URL. By default it use an in memory SQLite DB.",
         ),
     ]
+    DB_POOL_SIZE: Annotated[
+        int,
+        Field(
+            default=20,
+            ge=1,
+            description="Number of connections kept open in the DB connection pool. "
+            "Ignored when using SQLite.",
+        ),
+    ]
+    DB_MAX_OVERFLOW: Annotated[
+        int,
+        Field(
+            default=40,
+            ge=0,
+            description="Number of connections that can be opened beyond the DB pool "
+            "size. Ignored when using SQLite.",
+        ),
+    ]
     OPA_AUTHZ_URL: Annotated[
         AnyHttpUrl,
         Field(
@@ -91,6 +110,33 @@ class Settings(BaseSettings):
             description="Open Policy Agent service roles authorization URL",
         ),
     ]
+    OPA_CACHE_TTL: Annotated[
+        int,
+        Field(
+            default=5,
+            ge=0,
+            description="Number of seconds OPA authorization decisions are cached. "
+            "Policy changes become effective after at most this delay. "
+            "Set to 0 to disable the cache.",
+        ),
+    ]
+    OPA_UDS_PATH: Annotated[
+        str | None,
+        Field(
+            default=None,
+            description="Path of the Unix domain socket exposed by an OPA sidecar. "
+            "When set, OPA requests are sent through the socket and OPA_AUTHZ_URL is "
+            "only used to build the request path.",
+        ),
+    ]
+    OPA_HTTP2: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Use HTTP/2 to contact OPA. HTTP/2 is negotiated only when "
+            "OPA is served over HTTPS, otherwise HTTP/1.1 is used.",
+        ),
+    ]
     DB_ECO: Annotated[
         bool, Field(default=False, description="Eco messages exchanged with the DB")
     ]
@@ -100,9 +146,9 @@ class Settings(BaseSettings):
         BeforeValidator(get_level),
     ]
     TRUSTED_IDP_LIST: Annotated[
-        list[AnyHttpUrl],
+        tuple[AnyHttpUrl, ...],
         Field(
-            default_factory=list,
+            default=(),
             description="List of the application trusted identity providers",
         ),
     ]
@@ -110,7 +156,18 @@ class Settings(BaseSettings):
         AuthenticationMethodsEnum | None,
         Field(
             default=None,
-            description="Authorization method to use. Allowed values: local",
+            description="Authentication method to use. Allowed values: local, jwt. "
+            "With 'jwt', access tokens issued by trusted IDPs are validated offline "
+            "and user information is read from the token claims.",
+        ),
+    ]
+    JWT_AUDIENCE: Annotated[
+        str | None,
+        Field(
+            default=None,
+            description="Audience the access tokens must be issued for. Checked only "
+            "with the 'jwt' authentication mode. When undefined, the token audience is "
+            "not verified.",
         ),
     ]
     AUTHZ_MODE: Annotated[
@@ -121,14 +178,14 @@ class Settings(BaseSettings):
         ),
     ]
     BACKEND_CORS_ORIGINS: Annotated[
-        list[AnyHttpUrl | Literal["*"]],
+        tuple[AnyHttpUrl | Literal["*"], ...],
         Field(
-            default=["http://localhost:3000/"],
+            default=("http://localhost:3000/",),
             description="JSON-formatted list of allowed origins",
         ),
     ]
 
-    model_config = SettingsConfigDict(env_file=".env")
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
 
     @model_validator(mode="after")
     def verify_authn_authz_mode(self) -> Self:
@@ -152,7 +209,11 @@ class Settings(BaseSettings):
 
 @lru_cache
 def get_settings() -> Settings:
-    """Retrieve cached settings."""
+    """Retrieve cached settings.
+
+    Settings are read from the environment only once and are immutable, so the same
+    instance can be shared by all modules.
+    """
     return Settings()
 
 
@@ -6,14 +6,40 @@ from typing import Annotated
 from fastapi import Depends
 from sqlmodel import Session, SQLModel, create_engine
 
-from app.config import get_settings
+from app.config import Settings, get_settings
 
-settings = get_settings()
+DB_POOL_RECYCLE = 1800
+
+
+def get_engine_options(settings: Settings) -> dict:
+    """Return the engine creation options depending on the DB backend.
+
+    SQLite connections can be shared between threads. The other backends use a
+    connection pool sized from the settings, whose connections are checked before
+    being used and recycled after DB_POOL_RECYCLE seconds to avoid using connections
+    closed by the server.
+
+    Args:
+        settings: The application settings instance.
 
-connect_args = {}
-if settings.DB_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-engine = create_engine(settings.DB_URL, connect_args=connect_args, echo=settings.DB_ECO)
+    Returns:
+        dict: Keyword arguments to pass to create_engine.
+
+    """
+    if settings.DB_URL.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+settings = get_settings()
+engine = create_engine(
+    settings.DB_URL, echo=settings.DB_ECO, **get_engine_options(settings)
+)
 
 
 def create_db_and_tables(logger: Logger) -> None:
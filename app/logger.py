@@ -1,22 +1,29 @@
 """Logger modules."""
 
+import atexit
 import logging
+import queue
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 
 from app.config import Settings
 
 
-def get_logger(settings: Settings) -> logging.Logger:
-    """Create and configure a logger for the app API service.
+@lru_cache(maxsize=1)
+def get_queue_handler() -> QueueHandler:
+    """Create the handler passing log records to a background thread.
 
-    The logger outputs log messages to the console with a detailed format including
-    timestamp, log level, logger name, process and thread information, and the message.
-    The log level is set based on the application settings.
+    Records are put in a queue and written to the console by a QueueListener running
+    in its own thread, so that request handlers never block on console I/O. The
+    console output has a detailed format including timestamp, log level, logger name,
+    process and thread information, and the message. The listener is stopped, flushing
+    pending records, when the interpreter exits.
 
-    Args:
-        settings: The application settings instance containing the log level.
+    The handler is created only once and shared by all the loggers.
 
     Returns:
-        logging.Logger: The configured logger instance.
+        QueueHandler: The handler to attach to loggers. Its listener is available in
+            the `listener` attribute.
 
     """
     formatter = logging.Formatter(
@@ -27,8 +34,33 @@ def get_logger(settings: Settings) -> logging.Logger:
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
 
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler.listener = listener
+    return queue_handler
+
+
+def get_logger(settings: Settings) -> logging.Logger:
+    """Create and configure a logger for the app API service.
+
+    The logger sends log messages to the console through a queue, without blocking
+    the caller. The log level is set based on the application settings. Calling this
+    function multiple times does not duplicate the logger handlers.
+
+    Args:
+        settings: The application settings instance containing the log level.
+
+    Returns:
+        logging.Logger: The configured logger instance.
+
+    """
     logger = logging.getLogger("app-api")
     logger.setLevel(level=settings.LOG_LEVEL)
-    logger.addHandler(stream_handler)
+    queue_handler = get_queue_handler()
+    if queue_handler not in logger.handlers:
+        logger.addHandler(queue_handler)
 
     return logger
@@ -5,8 +5,13 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from app.auth import configure_flaat
+from app.auth import (
+    configure_flaat,
+    create_opa_cache,
+    create_opa_client,
+)
 from app.config import API_V1_STR, get_settings
 from app.db import create_db_and_tables, dispose_engine
 from app.logger import get_logger
@@ -42,19 +47,28 @@ async def lifespan(app: FastAPI):
     - Initializes the application logger and attaches it to the request state.
     - Configures authentication/authorization (Flaat).
     - Creates database tables if they do not exist.
-    - Cleans up resources and disposes the database engine on shutdown.
+    - Opens the pooled HTTP client used to contact OPA and creates the OPA decisions
+      cache. Both are attached to the request state.
+    - Cleans up resources, closes the OPA client and disposes the database engine on
+      shutdown.
 
     Args:
         app: The FastAPI application instance.
 
     Yields:
-        dict: A dictionary with the logger instance, available in the request state.
+        dict: A dictionary with the logger instance, the OPA client and the OPA
+            decisions cache, available in the request state.
 
     """
     logger = get_logger(settings)
     configure_flaat(settings, logger)
     create_db_and_tables(logger)
-    yield {"logger": logger}
+    async with create_opa_client(settings) as opa_client:
+        yield {
+            "logger": logger,
+            "opa_client": opa_client,
+            "opa_cache": create_opa_cache(settings),
+        }
     dispose_engine(logger)
 
 
@@ -81,6 +95,7 @@ sub_app_v1 = FastAPI(
     summary=summary,
     title=settings.PROJECT_NAME,
     version=version,
+    default_response_class=ORJSONResponse,
 )
 sub_app_v1.include_router(router_v1)
 app.mount(API_V1_STR, sub_app_v1)
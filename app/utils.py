@@ -1,13 +1,20 @@
 """Utility functions and adapters for specific pydantic types."""
 
+import hashlib
 import re
+import uuid
+from functools import lru_cache
 
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Request, Response, status
 from fastapi.routing import APIRoute
-from pydantic import AnyHttpUrl
-from sqlmodel import String, TypeDecorator
+from pydantic import AnyHttpUrl, BaseModel, TypeAdapter
+from sqlmodel import LargeBinary, String, TypeDecorator, Uuid
 
 MAX_LEN = 255
+CACHE_CONTROL = "private, no-cache"
+# Positions between two words of a camel case string: a lower case letter or digit
+# followed by an upper case one, or the last letter of an acronym.
+_CAMEL_CASE_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z0-9])(?=[A-Z][a-z])")
 
 
 class HttpUrlType(TypeDecorator):
@@ -57,28 +64,168 @@ class HttpUrlType(TypeDecorator):
         return str(value)
 
 
-def add_allow_header_to_resp(router: APIRouter, response: Response) -> Response:
-    """List in the 'Allow' header the available HTTP methods for the resource.
+class UUIDBinary(TypeDecorator):
+    """SQL Adapter storing UUIDs as 16 bytes on SQLite.
+
+    By default SQLite stores UUIDs as 32 characters strings. Storing them as BLOB(16)
+    halves the size of primary key indexes. The other backends use their native UUID
+    type.
+    """
+
+    impl = Uuid
+    cache_ok = True
+    python_type = uuid.UUID
+
+    def load_dialect_impl(self, dialect):
+        """Return a BLOB(16) type on SQLite and the native UUID type otherwise.
+
+        Args:
+            dialect: The database dialect in use.
+
+        Returns:
+            The dialect specific type.
+
+        """
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(Uuid())
+
+    def process_bind_param(self, value, dialect) -> uuid.UUID | bytes | None:
+        """Convert the UUID value to bytes on SQLite before storing in the database.
+
+        Args:
+            value: The UUID value to be stored.
+            dialect: The database dialect in use.
+
+        Returns:
+            The UUID bytes on SQLite, the UUID otherwise.
+
+        """
+        if value is None or dialect.name != "sqlite":
+            return value
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value.bytes
+
+    def process_result_value(self, value, dialect) -> uuid.UUID | None:
+        """Convert the value from the database back to a UUID.
+
+        Args:
+            value: The value retrieved from the database.
+            dialect: The database dialect in use.
+
+        Returns:
+            uuid.UUID: The reconstructed UUID.
+
+        """
+        if value is None or dialect.name != "sqlite":
+            return value
+        return uuid.UUID(bytes=value)
+
+
+allow_headers: dict[int, tuple[APIRouter, str]] = {}
+
+
+def get_allow_header(router: APIRouter) -> str:
+    """Build the 'Allow' header value listing the HTTP methods of a router.
+
+    Routes do not change once the application has been set up, so the value is
+    computed on first use and cached for each router. Routers are not hashable, so
+    the cache is indexed by their identity and keeps a reference to them.
 
     Args:
         router: The APIRouter instance containing route definitions.
-        response: The FastAPI Response object to modify.
 
     Returns:
-        Response: The response object with the 'Allow' header set.
+        str: The sorted, comma separated, list of available HTTP methods.
 
     """
+    cached = allow_headers.get(id(router))
+    if cached is not None:
+        return cached[1]
     allowed_methods: set[str] = set()
     for route in router.routes:
         if isinstance(route, APIRoute):
             allowed_methods.update(route.methods)
-    response.headers["Allow"] = ", ".join(allowed_methods)
+    allow_header = ", ".join(sorted(allowed_methods))
+    allow_headers[id(router)] = (router, allow_header)
+    return allow_header
+
+
+def add_allow_header_to_resp(router: APIRouter, response: Response) -> Response:
+    """List in the 'Allow' header the available HTTP methods for the resource.
+
+    Args:
+        router: The APIRouter instance containing route definitions.
+        response: The FastAPI Response object to modify.
+
+    Returns:
+        Response: The response object with the 'Allow' header set.
+
+    """
+    response.headers["Allow"] = get_allow_header(router)
     return response
 
 
+@lru_cache
+def get_type_adapter(model: type[BaseModel]) -> TypeAdapter:
+    """Return the adapter serializing instances of the given model.
+
+    The adapter is built once per model.
+
+    Args:
+        model: The pydantic model class.
+
+    Returns:
+        TypeAdapter: The adapter of the model.
+
+    """
+    return TypeAdapter(model)
+
+
+def build_etag_response(
+    request: Request, content: BaseModel, model: type[BaseModel]
+) -> Response:
+    """Serialize the content and return it with its ETag.
+
+    The returned response bypasses the route response_model, so the content is
+    serialized through the given model: fields not declared by it are left out, as
+    FastAPI does with the response_model, before computing the ETag. The content is
+    not validated against the model, so it must be built from already validated data.
+
+    The ETag is the hash of the serialized body. When the request 'If-None-Match'
+    header contains the same ETag, a 304 response without body is returned. The
+    content is still queried and serialized to compute the ETag: a 304 response only
+    saves the bandwidth of the body. Clients must always revalidate the cached content
+    since its visibility depends on the user permissions.
+
+    Args:
+        request: The incoming request object.
+        content: The model to return to the client.
+        model: The response model declared by the route.
+
+    Returns:
+        Response: A 200 JSON response with the serialized content or an empty 304
+            response.
+
+    """
+    body = get_type_adapter(model).dump_json(content)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=128)
 def split_camel_case(text: str) -> str:
     """Split a camel case string into words separated by spaces.
 
+    Results are cached since the function is mainly applied to entity class names.
+
     Args:
         text: The camel case string to split.
 
@@ -86,7 +233,4 @@ def split_camel_case(text: str) -> str:
         str: The string with spaces inserted between camel case words.
 
     """
-    matches = re.finditer(
-        r".+?(?:(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z0-9])(?=[A-Z][a-z])|$)", text
-    )
-    return " ".join([m.group(0) for m in matches])
+    return _CAMEL_CASE_RE.sub(" ", text)
@@ -1,10 +1,15 @@
 """Create Read Update and Delete generic functions."""
 
+import operator
 import re
 import uuid
-from typing import TypeVar
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+from typing import NoReturn, TypeVar
 
 import sqlalchemy
+from sqlalchemy.orm import raiseload
+from sqlalchemy.sql.base import ExecutableOption
 from sqlmodel import Session, SQLModel, asc, delete, desc, func, select, update
 
 from app.exceptions import ConflictError, NoItemToUpdateError, NotNullError
@@ -16,43 +21,153 @@ Entity = TypeVar("Entity", bound=ItemID)
 CreateModel = TypeVar("CreateModel", bound=SQLModel)
 UpdateModel = TypeVar("UpdateModel", bound=SQLModel)
 
+_RE_INTEGRITY = re.compile(
+    r"(?P<kind>NOT NULL|UNIQUE) constraint failed:\s+"
+    r"(?P<cols>\w+\.\w+(?:,\s*\w+\.\w+)*)"
+)
+_SQLSTATE_NOT_NULL = "23502"
+# Relationships must be loaded explicitly, through selectinload or joinedload options,
+# instead of silently issuing one query per item when they are first accessed.
+DEFAULT_LOADER_OPTIONS = (raiseload("*"),)
+_RANGE_HANDLERS = {
+    "created_before": ("created_at", operator.le),
+    "updated_before": ("updated_at", operator.le),
+    "created_after": ("created_at", operator.ge),
+    "updated_after": ("updated_at", operator.ge),
+}
+
+
+def parse_integrity_error(
+    *, entity: type[Entity], error: Exception
+) -> tuple[str, list[str]] | None:
+    """Return the kind of violated constraint and the attributes involved.
+
+    When the DB driver exposes the error diagnostics (i.e. psycopg through
+    `orig.diag`), a NOT NULL violation is read from the SQLSTATE and the column name.
+    When the name of the violated constraint is a UNIQUE or PRIMARY KEY constraint of
+    the entity table, the attributes are read from it: unnamed constraints get the
+    PostgreSQL default names through the metadata naming convention. Other named
+    constraints (i.e. foreign keys or checks) are not reported as conflicts. Otherwise
+    the kind and the attributes are parsed, in a single pass, from the SQLite error
+    message, which lists all the columns of a composite constraint.
+
+    Args:
+        entity: The SQLModel entity class involved in the operation.
+        error: The exception raised during the database operation.
+
+    Returns:
+        Tuple with the constraint kind ('NOT NULL' or 'UNIQUE') and the list of the
+        attribute names, or None if the error is not a recognized violation.
+
+    """
+    diag = getattr(getattr(error, "orig", None), "diag", None)
+    if getattr(diag, "sqlstate", None) == _SQLSTATE_NOT_NULL:
+        return "NOT NULL", [diag.column_name]
+    constraint_name = getattr(diag, "constraint_name", None)
+    if constraint_name is not None:
+        for constraint in entity.__table__.constraints:
+            if constraint.name == constraint_name and isinstance(
+                constraint,
+                sqlalchemy.UniqueConstraint | sqlalchemy.PrimaryKeyConstraint,
+            ):
+                return "UNIQUE", [col.name for col in constraint.columns]
+
+    match = _RE_INTEGRITY.search(error.args[0])
+    if match is None:
+        return None
+    attrs = [col.split(".")[-1].strip() for col in match.group("cols").split(",")]
+    return match.group("kind"), attrs
+
 
 def raise_from_integrity_error(
     *,
     entity: type[Entity],
     session: Session,
-    item: CreateModel | UpdateModel,
+    item: CreateModel | UpdateModel | None,
     error: Exception,
-):
+) -> NoReturn:
     """Handle and raise specific errors for NOT NULL and UNIQUE constraint violations.
 
     Args:
         entity: The SQLModel entity class involved in the operation.
         session: The SQLModel session for database access.
-        item: The model instance being created or updated.
+        item: The model instance being created or updated. None when the operation
+            involves multiple items and the failing one is unknown.
         error: The exception raised during the database operation.
 
     Raises:
         NotNullError: If a NOT NULL constraint is violated.
         ConflictError: If a UNIQUE constraint is violated.
+        Exception: The given error, if it is not a recognized violation.
 
     """
     session.rollback()
     element_str = split_camel_case(entity.__name__)
 
-    match = re.search(r"(?<=NOT\sNULL\sconstraint\sfailed:\s).*", error.args[0])
-    if match is not None:
-        attr = match.group(0).split(".")[1]
+    violation = parse_integrity_error(entity=entity, error=error)
+    if violation is None:
+        raise error
+    kind, attrs = violation
+
+    if kind == "NOT NULL":
         raise NotNullError(
-            f"Attribute '{attr}' of {element_str} can't be NULL"
+            f"Attribute '{attrs[0]}' of {element_str} can't be NULL"
         ) from error
 
-    match = re.search(r"(?<=UNIQUE\sconstraint\sfailed:\s).*", error.args[0])
-    if match is not None:
-        attr = match.group(0).split(".")[1]
+    if item is None:
         raise ConflictError(
-            f"{element_str} with {attr} '{item.model_dump().get(attr)}' already exists"
+            f"{element_str} with the given {' and '.join(attrs)} already exists"
         ) from error
+    values = item.model_dump()
+    details = " and ".join(f"{attr} '{values.get(attr)}'" for attr in attrs)
+    raise ConflictError(f"{element_str} with {details} already exists") from error
+
+
+@lru_cache
+def get_columns(entity: type[Entity]) -> dict[str, sqlalchemy.Column]:
+    """Return the table columns of an entity indexed by name.
+
+    The mapping is built once per entity class.
+
+    Args:
+        entity: The SQLModel entity class.
+
+    Returns:
+        Dict mapping column names to the corresponding table columns.
+
+    """
+    return dict(entity.__table__.c.items())
+
+
+@lru_cache
+def get_filters(
+    entity: type[Entity],
+) -> dict[str, tuple[sqlalchemy.Column, Callable | None]]:
+    """Return the filters accepted by an entity, with their column and operator.
+
+    Each column can be filtered by its name and, with the _lte/_gte suffixes, by
+    range. The 'created_before', 'created_after', 'updated_before' and
+    'updated_after' filters are available when the entity has the corresponding
+    column. The table is built once per entity.
+
+    Args:
+        entity: The SQLModel entity class.
+
+    Returns:
+        Dict mapping filter names to the target column and the comparison operator.
+        The operator is None for plain field filters.
+
+    """
+    filters = {}
+    columns = get_columns(entity)
+    for name, col in columns.items():
+        filters[name] = (col, None)
+        filters[f"{name}_lte"] = (col, operator.le)
+        filters[f"{name}_gte"] = (col, operator.ge)
+    for name, (col_name, op) in _RANGE_HANDLERS.items():
+        if col_name in columns:
+            filters[name] = (columns[col_name], op)
+    return filters
 
 
 def get_conditions(
@@ -60,6 +175,9 @@ def get_conditions(
 ) -> list[sqlalchemy.BinaryExpression]:
     """Build a list of SQLAlchemy filter conditions for querying items.
 
+    String values of plain field filters match any value containing them (case
+    insensitive); other values must be equal.
+
     Args:
         entity: The SQLModel entity class to filter.
         **kwargs: Arbitrary filter parameters, such as field values or range conditions.
@@ -70,47 +188,47 @@ def get_conditions(
     Returns:
         List of SQLAlchemy binary expressions to be used in a query filter.
 
+    Raises:
+        KeyError: If a filter does not match any entity field.
+
     """
+    filters = get_filters(entity)
     conditions = []
     for k, v in kwargs.items():
-        if k == "created_before":
-            conditions.append(entity.__table__.c.get("created_at") <= v)
-        elif k == "updated_before":
-            conditions.append(entity.__table__.c.get("updated_at") <= v)
-        elif k == "created_after":
-            conditions.append(entity.__table__.c.get("created_at") >= v)
-        elif k == "updated_after":
-            conditions.append(entity.__table__.c.get("updated_at") >= v)
+        col, op = filters[k]
+        if op is not None:
+            conditions.append(op(col, v))
         elif isinstance(v, str):
-            conditions.append(entity.__table__.c.get(k).icontains(v))
-        elif isinstance(v, (int, float)):
-            if k.endswith("_lte"):
-                k = k[:-4]
-                conditions.append(entity.__table__.c.get(k) <= v)
-            elif k.endswith("_gte"):
-                k = k[:-4]
-                conditions.append(entity.__table__.c.get(k) >= v)
-            else:
-                conditions.append(entity.__table__.c.get(k) == v)
+            conditions.append(col.icontains(v))
+        else:
+            conditions.append(col == v)
     return conditions
 
 
 def get_item(
-    *, entity: type[Entity], session: Session, item_id: uuid.UUID
+    *,
+    entity: type[Entity],
+    session: Session,
+    item_id: uuid.UUID,
+    options: Sequence[ExecutableOption] = DEFAULT_LOADER_OPTIONS,
 ) -> Entity | None:
     """Retrieve a single item by its ID from the database.
 
+    The lookup goes through the session identity map: an item already loaded in the
+    same session is returned without querying the DB.
+
     Args:
         entity: The SQLModel entity class to query.
         session: The SQLModel session for database access.
         item_id: The UUID of the item to retrieve.
+        options: Loader options to apply to the entity relationships. By default
+            accessing a relationship not eagerly loaded raises an error.
 
     Returns:
         The entity instance if found, otherwise None.
 
     """
-    statement = select(entity).where(entity.id == item_id)
-    return session.exec(statement).first()
+    return session.get(entity, item_id, options=options)
 
 
 def get_items(
@@ -120,12 +238,15 @@ def get_items(
     skip: int,
     limit: int,
     sort: str,
+    options: Sequence[ExecutableOption] = DEFAULT_LOADER_OPTIONS,
     **kwargs,
 ) -> tuple[list[Entity], int]:
     """Retrieve a paginated and sorted list of items, with total count, from the DB.
 
     The total count corresponds to the total count of returned values which may differs
-    from the showed users since they are paginated.
+    from the showed users since they are paginated. It is computed in the same query
+    through a window function; a dedicated count query is issued only when the
+    requested page is empty.
 
     Args:
         entity: The SQLModel entity class to query.
@@ -133,6 +254,10 @@ def get_items(
         skip: Number of items to skip (for pagination).
         limit: Maximum number of items to return.
         sort: Field name to sort by (prefix with '-' for descending).
+        options: Loader options to apply to the entity relationships. By default
+            accessing a relationship not eagerly loaded raises an error: pass
+            selectinload options to load them with one query for the whole page
+            instead of one query per item.
         **kwargs: Additional filter parameters (see get_conditions).
 
     Returns:
@@ -140,23 +265,32 @@ def get_items(
 
     """
     if sort.startswith("-"):
-        key = desc(entity.__table__.c.get(sort[1:]))
+        key = desc(get_columns(entity).get(sort[1:]))
     else:
-        key = asc(entity.__table__.c.get(sort))
+        key = asc(get_columns(entity).get(sort))
 
     conditions = get_conditions(entity=entity, **kwargs)
 
+    # The window function returns the total count of matching rows alongside each
+    # item, avoiding a second round-trip to the DB.
     statement = (
-        select(entity)
+        select(entity, func.count().over().label("total"))
         .offset(skip)
         .limit(limit)
         .order_by(key)
         .filter(sqlalchemy.and_(*conditions))
+        .options(*options)
     )
-    items = session.exec(statement).all()
+    rows = session.exec(statement).all()
+    items = [row[0] for row in rows]
 
-    statement = select(func.count(entity.id)).filter(sqlalchemy.and_(*conditions))
-    tot_items = session.exec(statement).first()
+    if rows:
+        tot_items = rows[0][1]
+    else:
+        # An empty page does not tell whether there are no matches or whether the
+        # offset is greater than the total count.
+        statement = select(func.count(entity.id)).filter(sqlalchemy.and_(*conditions))
+        tot_items = session.exec(statement).first()
 
     return items, tot_items
 
@@ -196,6 +330,55 @@ def add_item(
         raise_from_integrity_error(entity=entity, session=session, item=item, error=e)
 
 
+def add_items(
+    *,
+    entity: type[Entity],
+    session: Session,
+    items: list[CreateModel],
+    created_by: User | None = None,
+) -> list[Entity]:
+    """Add multiple items to the database in a single transaction.
+
+    IDs are generated client side, so the ORM sends the rows in batched INSERT
+    statements and the transaction is committed once. The new instances are not
+    expired by the commit: they hold the given values and the generated ids, so
+    reading them does not issue a SELECT per row. Columns filled by the DB (i.e.
+    server defaults) are not loaded on them.
+
+    Args:
+        entity: The SQLModel entity class to add.
+        session: The SQLModel session for database access.
+        items: The Pydantic/SQLModel model instances to add.
+        created_by: The user who is creating the items, or None if not applicable.
+
+    Returns:
+        The newly created entity instances, in the same order of the given items.
+
+    Raises:
+        NotNullError: If a NOT NULL constraint is violated.
+        ConflictError: If a UNIQUE constraint is violated. The whole transaction is
+            rolled back and the error only reports the conflicting attributes, not
+            which of the given items caused it.
+        sqlalchemy.exc.IntegrityError: If another constraint is violated. The whole
+            transaction is rolled back.
+
+    """
+    kwargs = {}
+    if created_by is not None:
+        kwargs = {"created_by": created_by.id}
+    expire_on_commit = session.expire_on_commit
+    try:
+        db_items = [entity(**item.model_dump(), **kwargs) for item in items]
+        session.add_all(db_items)
+        session.expire_on_commit = False
+        session.commit()
+        return db_items
+    except sqlalchemy.exc.IntegrityError as e:
+        raise_from_integrity_error(entity=entity, session=session, item=None, error=e)
+    finally:
+        session.expire_on_commit = expire_on_commit
+
+
 def update_item(
     *,
     entity: type[Entity],
@@ -206,6 +389,8 @@ def update_item(
 ) -> None:
     """Update an existing item in the database with new data.
 
+    Only the fields explicitly set in new_data are sent to the DB.
+
     Args:
         entity: The SQLModel entity class to update.
         session: The SQLModel session for database access.
@@ -222,11 +407,14 @@ def update_item(
     try:
         kwargs = {}
         if updated_by is not None:
-            kwargs = {"updated_by": updated_by.id, "updated_at": func.now}
+            kwargs = {"updated_by": updated_by.id, "updated_at": func.now()}
+        # The session does not need to refresh in-memory objects: they are not reused
+        # after the update in the same session.
         statement = (
             update(entity)
             .where(entity.id == item_id)
-            .values(**new_data.model_dump(), **kwargs)
+            .values(**new_data.model_dump(exclude_unset=True), **kwargs)
+            .execution_options(synchronize_session=False)
         )
         result = session.exec(statement)
         if result.rowcount == 0:
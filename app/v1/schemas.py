@@ -1,14 +1,23 @@
 """Common pydantic schemas."""
 
-import math
 import uuid
 from datetime import datetime
+from functools import cached_property
 from typing import Annotated
 
 from fastapi.datastructures import URL
 from pydantic import AnyHttpUrl, computed_field
 from sqlmodel import Field, SQLModel, func
 
+from app.utils import UUIDBinary
+
+# Unnamed primary keys and UNIQUE constraints get the default PostgreSQL names, so the
+# constraint names reported by the DB driver on violations match the metadata ones.
+SQLModel.metadata.naming_convention = {
+    "pk": "%(table_name)s_pkey",
+    "uq": "%(table_name)s_%(column_0_N_name)s_key",
+}
+
 
 class ItemID(SQLModel):
     """Schema usually returned by POST operation with only the item ID.
@@ -22,6 +31,7 @@ class ItemID(SQLModel):
             default_factory=uuid.uuid4,
             description="Item unique ID in the DB",
             primary_key=True,
+            sa_type=UUIDBinary,
         ),
     ]
 
@@ -64,14 +74,14 @@ class Pagination(SQLModel):
     total_elements: Annotated[int, Field(description="Total number of items")]
 
     @computed_field
-    @property
+    @cached_property
     def total_pages(self) -> int:
         """Return the ceiling value of tot_items/page size.
 
-        If there are no elements, there is still one page but with no items.
+        If there are no elements, there is still one page but with no items. The
+        ceiling is computed with integer arithmetic.
         """
-        val = math.ceil(self.total_elements / self.size)
-        return 1 if val == 0 else val
+        return max(1, -(-self.total_elements // self.size))
 
 
 class PageNavigation(SQLModel):
@@ -112,23 +122,24 @@ class PaginatedList(SQLModel):
     ]
 
     @computed_field
-    @property
+    @cached_property
     def page(self) -> Pagination:
-        """Return the pagination details."""
+        """Return the pagination details.
+
+        The result is computed once per instance and reused when building the links.
+        """
         return Pagination(
             number=self.page_number, size=self.page_size, total_elements=self.tot_items
         )
 
     @computed_field
-    @property
+    @cached_property
     def links(self) -> PageNavigation:
         """Build navigation links for paginated API responses.
 
-        Args:
-            url: The base URL for navigation links.
-            size: The number of items per page.
-            curr_page: The current page number.
-            tot_pages: The total number of pages available.
+        The page query parameter is removed once from the resource URL and the page
+        links are built appending the page number to it. The result is computed once
+        per instance.
 
         Returns:
             PageNavigation: An object containing first, previous, next, and last page
@@ -136,17 +147,17 @@ class PaginatedList(SQLModel):
 
         """
         url = URL(str(self.resource_url)).remove_query_params("page")
-        first_page = url.include_query_params(page=1)._url
-        if self.page_number > 1:
-            prev_page = url.include_query_params(page=self.page_number - 1)._url
-        else:
-            prev_page = None
-
-        if self.page_number < self.page.total_pages:
-            next_page = url.include_query_params(page=self.page_number + 1)._url
+        base_url = str(url) + ("&page=" if url.query else "?page=")
+        tot_pages = self.page.total_pages
+        first_page = f"{base_url}1"
+        prev_page = (
+            f"{base_url}{self.page_number - 1}" if self.page_number > 1 else None
+        )
+        if self.page_number < tot_pages:
+            next_page = f"{base_url}{self.page_number + 1}"
         else:
             next_page = None
-        last_page = url.include_query_params(page=self.page.total_pages)._url
+        last_page = f"{base_url}{tot_pages}"
 
         return PageNavigation(
             first=first_page, prev=prev_page, next=next_page, last=last_page
@@ -160,7 +171,7 @@ class CreationTime(SQLModel):
         datetime,
         Field(
             description="Date time of when the entity has been created",
-            default=func.now(),
+            sa_column_kwargs={"server_default": func.now()},
         ),
     ]
 
@@ -191,7 +202,11 @@ class Creator(SQLModel):
 
     created_by: Annotated[
         uuid.UUID,
-        Field(description="User who created this item.", foreign_key="user.id"),
+        Field(
+            description="User who created this item.",
+            foreign_key="user.id",
+            sa_type=UUIDBinary,
+        ),
     ]
 
 
@@ -219,7 +234,7 @@ class UpdateTime(SQLModel):
         datetime,
         Field(
             description="Datetime of when the entity has been updated",
-            default=func.now(),
+            sa_column_kwargs={"server_default": func.now()},
         ),
     ]
 
@@ -250,7 +265,11 @@ class Editor(SQLModel):
 
     updated_by: Annotated[
         uuid.UUID,
-        Field(description="User who last updated this item.", foreign_key="user.id"),
+        Field(
+            description="User who last updated this item.",
+            foreign_key="user.id",
+            sa_type=UUIDBinary,
+        ),
     ]
 
 
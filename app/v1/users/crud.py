@@ -4,18 +4,47 @@ This module provides functions to retrieve, list, add, and delete users in the d
 It wraps generic CRUD operations with user-specific logic and exception handling.
 """
 
+import threading
 import uuid
 from typing import Annotated
 
+from cachetools import TTLCache
 from fastapi import Depends
 from sqlmodel import Session
 
 from app.auth import AuthenticationDep
 from app.db import SessionDep
 from app.v1.crud import add_item, delete_item, get_item, get_items, update_item
-from app.v1.schemas import ItemID
 from app.v1.users.schemas import User, UserCreate
 
+CURRENT_USER_CACHE_SIZE = 10000
+CURRENT_USER_CACHE_TTL = 60
+
+current_user_ids = TTLCache(maxsize=CURRENT_USER_CACHE_SIZE, ttl=CURRENT_USER_CACHE_TTL)
+# Reverse mapping from the user ID to its current_user_ids key. Entries are added,
+# read and removed together with the current_user_ids ones, so they expire together.
+current_user_keys = TTLCache(
+    maxsize=CURRENT_USER_CACHE_SIZE, ttl=CURRENT_USER_CACHE_TTL
+)
+current_user_ids_lock = threading.Lock()
+
+
+def forget_current_user(user_id: uuid.UUID) -> None:
+    """Remove the given user from the current users cache.
+
+    The cache entry is found through the reverse mapping, without scanning the cache.
+    The cache is local to the process: other workers may keep the removed user ID for
+    up to CURRENT_USER_CACHE_TTL seconds.
+
+    Args:
+        user_id: The UUID of the user to remove.
+
+    """
+    with current_user_ids_lock:
+        key = current_user_keys.pop(user_id, None)
+        if key is not None:
+            current_user_ids.pop(key, None)
+
 
 def get_user(user_id: uuid.UUID, session: SessionDep) -> User | None:
     """Retrieve a user by their unique user_id from the database.
@@ -55,7 +84,7 @@ def get_users(
     )
 
 
-def add_user(*, session: Session, user: UserCreate) -> ItemID:
+def add_user(*, session: Session, user: UserCreate) -> User:
     """Add a new user to the database.
 
     Args:
@@ -63,7 +92,7 @@ def add_user(*, session: Session, user: UserCreate) -> ItemID:
         user: The UserCreate model instance to add.
 
     Returns:
-        ItemID: The identifier of the newly created user.
+        User: The newly created user.
 
     """
     return add_item(session=session, entity=User, item=user)
@@ -80,6 +109,7 @@ def update_user(*, session: Session, user_id: uuid.UUID, new_user: UserCreate) -
         new_user: The new data to update the user with.
 
     """
+    forget_current_user(user_id)
     return update_item(session=session, entity=User, item_id=user_id, new_data=new_user)
 
 
@@ -91,12 +121,19 @@ def delete_user(*, session: Session, user_id: uuid.UUID) -> None:
         user_id: The UUID of the user to delete.
 
     """
+    forget_current_user(user_id)
     return delete_item(session=session, entity=User, item_id=user_id)
 
 
 def get_current_user(user_infos: AuthenticationDep, session: SessionDep) -> User | None:
     """Retrieve from the DB the user matching the user submitting the request.
 
+    The ID of the user matching the token subject and issuer is cached for
+    CURRENT_USER_CACHE_TTL seconds, so that following requests retrieve the user by
+    primary key instead of filtering users. Cache entries are removed when the user is
+    updated or deleted through this process; other workers may keep them for up to
+    CURRENT_USER_CACHE_TTL seconds.
+
     Args:
         user_infos: The authentication dependency containing user information.
         session: The database session dependency.
@@ -105,15 +142,30 @@ def get_current_user(user_infos: AuthenticationDep, session: SessionDep) -> User
         User instance if found, otherwise None.
 
     """
+    key = (user_infos.user_info["sub"], user_infos.user_info["iss"])
+    with current_user_ids_lock:
+        user_id = current_user_ids.get(key)
+        if user_id is not None:
+            # Keep the reverse entry as recently used as the forward one.
+            current_user_keys.get(user_id)
+    if user_id is not None:
+        user = session.get(User, user_id)
+        if user is not None:
+            return user
     users, count = get_users(
         session=session,
         skip=0,
         limit=1,
         sort="-created_at",
-        sub=user_infos.user_info["sub"],
-        issuer=user_infos.user_info["iss"],
+        sub=key[0],
+        issuer=key[1],
     )
-    return None if count == 0 else users[0]
+    if count == 0:
+        return None
+    with current_user_ids_lock:
+        current_user_ids[key] = users[0].id
+        current_user_keys[users[0].id] = key
+    return users[0]
 
 
 CurrenUserDep = Annotated[User, Depends(get_current_user)]
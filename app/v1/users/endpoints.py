@@ -12,11 +12,13 @@ from fastapi import (
     Security,
     status,
 )
+from flaat.user_infos import UserInfos
+from pydantic import ValidationError
 
 from app.auth import AuthenticationDep, check_authorization
 from app.db import SessionDep
 from app.exceptions import ConflictError, NoItemToUpdateError, NotNullError
-from app.utils import add_allow_header_to_resp
+from app.utils import build_etag_response, get_allow_header
 from app.v1.schemas import ErrorMessage, ItemID
 from app.v1.users.crud import (
     add_user,
@@ -25,7 +27,11 @@ from app.v1.users.crud import (
     get_users,
     update_user,
 )
-from app.v1.users.schemas import User, UserCreate, UserList, UserQueryDep
+from app.v1.users.schemas import User, UserCreate, UserList, UserQuery, UserQueryDep
+
+USER_FILTERS = tuple(
+    k for k in UserQuery.model_fields if k not in ("page", "size", "sort")
+)
 
 user_router = APIRouter(prefix="/users", tags=["users"])
 
@@ -36,18 +42,57 @@ user_router = APIRouter(prefix="/users", tags=["users"])
     description="List available endpoints for this resource in the 'Allow' header.",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def available_methods(response: Response) -> None:
-    """Add the HTTP 'Allow' header to the response.
+def available_methods() -> Response:
+    """Return an empty response listing the available methods in the 'Allow' header.
+
+    The header value is computed once, on the first request, and then reused.
+
+    Returns:
+        Response: The empty response with the 'Allow' header.
+
+    """
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={"Allow": get_allow_header(user_router)},
+    )
+
+
+def build_user_from_infos(request: Request, user_infos: UserInfos) -> UserCreate:
+    """Build the data of the user to create from the current user information.
+
+    The name and email come from the identity provider or, with offline JWT
+    validation, from the access token claims. The token signature does not guarantee
+    their format, so they are validated as a request body would be.
 
     Args:
-        response (Response): The HTTP response object to which the 'Allow' header will
-            be added.
+        request (Request): The incoming HTTP request object, used for logging.
+        user_infos (UserInfos): The authentication information of the current user.
 
     Returns:
-        None
+        UserCreate: The validated user data.
+
+    Raises:
+        HTTPException: 422 if the user information lack or have an invalid name or
+            email.
 
     """
-    add_allow_header_to_resp(user_router, response)
+    try:
+        return UserCreate(
+            sub=user_infos.subject,
+            issuer=user_infos.issuer,
+            name=user_infos.user_info.get("name"),
+            email=user_infos.user_info.get("email"),
+        )
+    except ValidationError as e:
+        fields = " and ".join(sorted({str(err["loc"][0]) for err in e.errors()}))
+        message = (
+            f"Missing or invalid {fields} in the user information: provide them in "
+            "the request body"
+        )
+        request.state.logger.error(message)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=message
+        ) from e
 
 
 @user_router.post(
@@ -75,7 +120,7 @@ def create_user(
 
     Logs the creation attempt and result. If the user already exists, returns a 409
     Conflict response. If no body is given, it retrieves from the access token the user
-    data.
+    data (see build_user_from_infos).
 
     Args:
         request (Request): The incoming HTTP request object, used for logging.
@@ -91,21 +136,16 @@ def create_user(
         401 Unauthorized: If the user is not authenticated (handled by dependencies).
         403 Forbidden: If the user does not have permission (handled by dependencies).
         409 Conflict: If the user already exists (handled below).
+        422 Unprocessable Entity: If no body is given and the user information lack
+            or have invalid name or email.
 
     """
     try:
         if user is None:
-            user = User(
-                sub=current_user_infos.subject,
-                issuer=current_user_infos.issuer,
-                name=current_user_infos.user_info["name"],
-                email=current_user_infos.user_info["email"],
-            )
-        request.state.logger.info(
-            "Creating user with params: %s", user.model_dump(exclude_none=True)
-        )
+            user = build_user_from_infos(request, current_user_infos)
+        request.state.logger.info("Creating user with params: %r", user)
         db_user = add_user(session=session, user=user)
-        request.state.logger.info("User created: %s", repr(db_user))
+        request.state.logger.info("User created: %r", db_user)
         return {"id": db_user.id}
     except ConflictError as e:
         request.state.logger.error(e.message)
@@ -126,16 +166,19 @@ def create_user(
 @user_router.get(
     "/",
     summary="Retrieve users",
-    description="Retrieve a paginated list of users.",
+    description="Retrieve a paginated list of users. The response carries an ETag; "
+    "if it matches the 'If-None-Match' header, the endpoint returns a 304 status.",
     dependencies=[Security(check_authorization)],
+    response_model=UserList,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"},
         status.HTTP_401_UNAUTHORIZED: {"model": ErrorMessage},
         status.HTTP_403_FORBIDDEN: {"model": ErrorMessage},
     },
 )
 def retrieve_users(
     request: Request, params: UserQueryDep, session: SessionDep
-) -> UserList:
+) -> Response:
     """Retrieve a paginated list of users based on query parameters.
 
     Logs the query parameters and the number of users retrieved. Fetches users from the
@@ -149,40 +192,45 @@ def retrieve_users(
         session (SessionDep): Database session dependency.
 
     Returns:
-        UserList: A paginated list of users matching the query parameters.
+        Response: A paginated list of users matching the query parameters, with its
+            ETag, or an empty 304 response if the client already has it.
 
     Raises:
         401 Unauthorized: If the user is not authenticated (handled by dependencies).
         403 Forbidden: If the user does not have permission (handled by dependencies).
 
     """
-    request.state.logger.info(
-        "Retrieve users. Query params: %s", params.model_dump(exclude_none=True)
-    )
+    request.state.logger.info("Retrieve users. Query params: %r", params)
     users, tot_items = get_users(
         session=session,
         skip=(params.page - 1) * params.size,
         limit=params.size,
         sort=params.sort,
-        **params.model_dump(exclude={"page", "size", "sort"}, exclude_none=True),
+        **{k: v for k in USER_FILTERS if (v := getattr(params, k)) is not None},
     )
-    request.state.logger.info("%d retrieved users: %s", tot_items, repr(users))
-    return UserList(
+    request.state.logger.info("%d retrieved users: %r", tot_items, users)
+    # Users come from the DB and the pagination values from the validated query.
+    user_list = UserList.model_construct(
         data=users,
         resource_url=str(request.url),
         page_number=params.page,
         page_size=params.size,
         tot_items=tot_items,
     )
+    return build_etag_response(request, user_list, UserList)
 
 
 @user_router.get(
     "/{user_id}",
     summary="Retrieve user with given ID",
     description="Check if the given user's ID already exists in the DB and return it. "
-    "If the user does not exist in the DB, the endpoint raises a 404 error.",
+    "If the user does not exist in the DB, the endpoint raises a 404 error. The "
+    "response carries an ETag; if it matches the 'If-None-Match' header, the endpoint "
+    "returns a 304 status.",
     dependencies=[Security(check_authorization)],
+    response_model=User,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"},
         status.HTTP_401_UNAUTHORIZED: {"model": ErrorMessage},
         status.HTTP_403_FORBIDDEN: {"model": ErrorMessage},
         status.HTTP_404_NOT_FOUND: {"model": ErrorMessage},
@@ -192,7 +240,7 @@ def retrieve_user(
     request: Request,
     user_id: uuid.UUID,
     user: Annotated[User | None, Depends(get_user)],
-) -> User:
+) -> Response:
     """Retrieve a user by their unique identifier.
 
     Logs the retrieval attempt, checks if the user exists, and returns the user object
@@ -205,8 +253,8 @@ def retrieve_user(
         user (User | None): The user object, if found.
 
     Returns:
-        User: The user object if found.
-        JSONResponse: A 404 response if the user does not exist.
+        Response: The user data, with its ETag, or an empty 304 response if the client
+            already has it.
 
     Raises:
         401 Unauthorized: If the user is not authenticated (handled by dependencies).
@@ -214,7 +262,7 @@ def retrieve_user(
         404 Not Found: If the user does not exist (handled below).
 
     """
-    request.state.logger.info("Retrieve user with ID '%s'", str(user_id))
+    request.state.logger.info("Retrieve user with ID '%s'", user_id)
     if user is None:
         message = f"User with ID '{user_id!s}' does not exist"
         request.state.logger.error(message)
@@ -223,8 +271,8 @@ def retrieve_user(
         #     status_code=status.HTTP_404_NOT_FOUND,
         #     content={"title": "User not found", "detail": message},
         # )
-    request.state.logger.info("User with ID '%s' found: %s", str(user_id), repr(user))
-    return user
+    request.state.logger.info("User with ID '%s' found: %r", user_id, user)
+    return build_etag_response(request, user, User)
 
 
 @user_router.put(
@@ -259,7 +307,7 @@ def edit_user(
         HTTPException: If the user is not found or another update error occurs.
 
     """
-    request.state.logger.info("Update user with ID '%s'", str(user_id))
+    request.state.logger.info("Update user with ID '%s'", user_id)
     try:
         update_user(session=session, user_id=user_id, new_user=new_user)
     except NoItemToUpdateError as e:
@@ -277,7 +325,7 @@ def edit_user(
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.message
         ) from e
-    request.state.logger.info("User with ID '%s' updated", str(user_id))
+    request.state.logger.info("User with ID '%s' updated", user_id)
 
 
 @user_router.delete(
@@ -311,6 +359,6 @@ def remove_user(request: Request, user_id: uuid.UUID, session: SessionDep) -> No
         403 Forbidden: If the user does not have permission (handled by dependencies).
 
     """
-    request.state.logger.info("Delete user with ID '%s'", str(user_id))
+    request.state.logger.info("Delete user with ID '%s'", user_id)
     delete_user(session=session, user_id=user_id)
-    request.state.logger.info("User with ID '%s' deleted", str(user_id))
+    request.state.logger.info("User with ID '%s' deleted", user_id)
@@ -22,9 +22,7 @@ class UserBase(SQLModel):
 
     sub: Annotated[str, Field(description="Issuer's subject associated with this user")]
     name: Annotated[str, Field(description="User name and surname")]
-    email: Annotated[
-        EmailStr, Field(description="User email address", sa_type=AutoString)
-    ]
+    email: Annotated[str, Field(description="User email address", sa_type=AutoString)]
     issuer: Annotated[AnyHttpUrl, Field(description="Issuer URL", sa_type=HttpUrlType)]
 
 
@@ -45,7 +43,13 @@ class UserList(PaginatedList):
 
 
 class UserCreate(UserBase):
-    """Schema used to define request's body parameters of a POST on 'users' endpoint."""
+    """Schema used to define request's body parameters of a POST on 'users' endpoint.
+
+    The email format is checked only here, on incoming data. Users read from the DB
+    carry already validated addresses.
+    """
+
+    email: Annotated[EmailStr, Field(description="User email address")]
 
 
 class UserQuery(CreationTimeQuery, PaginationQuery, SortQuery):
@@ -4,23 +4,84 @@ from unittest import mock
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
 
+import app.db as app_db
 from app.auth import check_authentication, check_authorization
 from app.main import app, sub_app_v1
 
 
+@pytest.fixture(scope="session", autouse=True)
+def db_engine():
+    """Replace the app engine with an in-memory SQLite one for the whole session.
+
+    A single connection is shared (StaticPool) so that all the sessions see the same
+    DB, whose tables are created once. The pysqlite driver transaction handling is
+    disabled in favour of explicit BEGIN statements, otherwise SAVEPOINTs would not
+    be rolled back with the enclosing transaction.
+    """
+    test_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(test_engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(test_engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    SQLModel.metadata.create_all(test_engine)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(app_db, "engine", test_engine)
+        yield test_engine
+    test_engine.dispose()
+
+
 @pytest.fixture
-def client():
-    """Fixture that returns a FastAPI TestClient for the app.
+def db_session(db_engine):
+    """Return a real session on the test DB whose changes are discarded after the test.
+
+    The session joins an outer transaction on a dedicated connection and turns its
+    own commits into savepoints, so the test data is dropped by a single rollback.
+    """
+    with db_engine.connect() as connection:
+        transaction = connection.begin()
+        with Session(
+            bind=connection, join_transaction_mode="create_savepoint"
+        ) as db_session:
+            yield db_session
+        transaction.rollback()
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """Fixture that returns a FastAPI TestClient shared by the whole test session.
 
-    Patch authentication dependencies to always allow access for tests
+    The application lifespan (DB tables creation, flaat configuration) runs only once.
     """
     with TestClient(app, headers={"Authorization": "Bearer fake-token"}) as test_client:
-        sub_app_v1.dependency_overrides[check_authentication] = lambda: None
-        sub_app_v1.dependency_overrides[check_authorization] = lambda: None
         yield test_client
 
 
+@pytest.fixture
+def client(app_client):
+    """Fixture that returns a FastAPI TestClient for the app.
+
+    Patch authentication dependencies to always allow access for tests. The dependency
+    overrides set by the test itself are dropped after each test.
+    """
+    sub_app_v1.dependency_overrides[check_authentication] = lambda: None
+    sub_app_v1.dependency_overrides[check_authorization] = lambda: None
+    yield app_client
+    sub_app_v1.dependency_overrides.clear()
+
+
 @pytest.fixture
 def session():
     """Create and return a mock session object for testing purposes.
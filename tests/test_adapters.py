@@ -4,17 +4,29 @@ These tests cover:
 - HttpUrlType process_bind_param
 - HttpUrlType process_result_value
 - HttpUrlType process_literal_param
+- UUIDBinary process_bind_param and process_result_value
+- UUIDBinary storage on SQLite
 """
 
+import uuid
+
+import pytest
 from pydantic import AnyHttpUrl
+from sqlalchemy import Column, MetaData, Table, create_engine, select, text
 
-from app.utils import HttpUrlType
+from app.utils import HttpUrlType, UUIDBinary
 
 
 class DummyDialect:
     """A dummy dialect class for testing purposes."""
 
-    pass
+    name = "dummy"
+
+
+class SQLiteDialect:
+    """A dummy SQLite dialect class for testing purposes."""
+
+    name = "sqlite"
 
 
 def test_process_bind_param_returns_string():
@@ -37,3 +49,42 @@ def test_process_literal_param_returns_string():
     url = AnyHttpUrl("https://example.com/path?q=1")
     result = HttpUrlType().process_literal_param(url, DummyDialect())
     assert result == str(url)
+
+
+@pytest.mark.parametrize(
+    "value", [uuid.uuid4(), str(uuid.uuid4())], ids=["uuid", "str"]
+)
+def test_uuid_binary_bind_param_sqlite(value):
+    """Return the UUID bytes when storing on SQLite."""
+    result = UUIDBinary().process_bind_param(value, SQLiteDialect())
+    assert result == uuid.UUID(str(value)).bytes
+
+
+def test_uuid_binary_result_value_sqlite():
+    """Return a UUID from the bytes stored on SQLite."""
+    value = uuid.uuid4()
+    assert UUIDBinary().process_result_value(value.bytes, SQLiteDialect()) == value
+
+
+def test_uuid_binary_other_dialects():
+    """Leave UUIDs unchanged for backends with a native UUID type."""
+    value = uuid.uuid4()
+    assert UUIDBinary().process_bind_param(value, DummyDialect()) is value
+    assert UUIDBinary().process_result_value(value, DummyDialect()) is value
+    assert UUIDBinary().process_bind_param(None, SQLiteDialect()) is None
+    assert UUIDBinary().process_result_value(None, SQLiteDialect()) is None
+
+
+def test_uuid_binary_sqlite_storage():
+    """Store UUIDs as 16 bytes blobs on SQLite and filter by UUID."""
+    table = Table("dummy", MetaData(), Column("id", UUIDBinary, primary_key=True))
+    engine = create_engine("sqlite://")
+    table.metadata.create_all(engine)
+    value = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(table.insert().values(id=value))
+        stored = conn.execute(text("SELECT typeof(id), length(id) FROM dummy")).one()
+        assert tuple(stored) == ("blob", 16)
+        assert conn.execute(select(table.c.id).where(table.c.id == value)).scalar() == (
+            value
+        )
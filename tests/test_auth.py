@@ -10,40 +10,95 @@ Tests performed in this file:
    Ensures user info is returned on successful authentication.
 4. test_check_flaat_authentication_failure:
    Ensures HTTP 403 is raised on authentication failure.
-5. test_check_authentication_local:
-   Checks user info is returned for local authentication.
-6. test_check_authentication_none:
-   Checks None is returned if authentication mode is None.
-7. test_check_opa_authorization_allow:
-   Ensures access is allowed when OPA returns allow=True.
-8. test_check_opa_authorization_deny:
-   Ensures HTTP 401 is raised when OPA returns allow=False.
-9. test_check_opa_authorization_bad_request:
-   Ensures HTTP 500 is raised on OPA bad request.
-10. test_check_opa_authorization_internal_error:
-    Ensures HTTP 500 is raised on OPA internal error.
-11. test_check_opa_authorization_unexpected_status:
-    Ensures HTTP 500 is raised on unexpected OPA status code.
-12. test_check_opa_authorization_timeout:
+5. test_check_flaat_authentication_cached:
+   Ensures user info of an already seen token are read from the cache.
+6. test_check_flaat_authentication_failure_not_cached:
+   Ensures failed authentications are not cached.
+7. test_user_infos_time_to_use:
+   Checks cached user info never outlive the access token.
+8. test_check_jwt_authentication_success:
+   Ensures a JWT is validated offline and user info are built from its claims.
+9. test_check_jwt_authentication_invalid_signature:
+   Ensures HTTP 403 is raised when the JWT signature is invalid.
+10. test_check_jwt_authentication_without_kid:
+    Ensures the signing key is inferred from the token without a key ID.
+11. test_check_jwt_authentication_missing_claims:
+    Ensures HTTP 403 is raised when required claims are missing.
+12. test_check_jwt_authentication_audience:
+    Ensures the audience is verified only when JWT_AUDIENCE is defined.
+13. test_check_jwt_authentication_keys_unreachable:
+    Ensures HTTP 403 is raised and the issuer skipped when its keys can't be fetched.
+14. test_check_jwt_authentication_fallback:
+    Ensures opaque tokens and untrusted issuers are delegated to flaat.
+15. test_get_jwks_client:
+    Checks JWKS clients are created once and only for trusted issuers.
+16. test_get_jwks_client_discovery_failure:
+    Checks None is returned, and the issuer skipped for a while, when the issuer
+    configuration can't be retrieved.
+17. test_check_opa_authorization_allow:
+    Ensures access is allowed when OPA returns allow=True.
+18. test_check_opa_authorization_rejected:
+    Ensures HTTP 401 is raised on deny and HTTP 500 on OPA errors or unexpected codes.
+19. test_check_opa_authorization_timeout:
     Ensures HTTP 500 is raised on OPA timeout.
-13. test_check_authorization_opa:
-    Checks OPA authorization is called when mode is OPA.
-14. test_check_authorization_none:
-    Ensures no error is raised when authorization mode is None.
+20. test_check_opa_authorization_unreachable:
+    Ensures HTTP 500 is raised when the OPA connection fails.
+21. test_check_opa_authorization_cached:
+    Ensures allow and deny decisions are cached and reused.
+22. test_check_opa_authorization_has_body:
+    Ensures the body presence is detected from the request headers, even with a
+    malformed content-length.
+23. test_check_opa_authorization_error_not_cached:
+    Ensures OPA failures are not cached.
+24. test_create_opa_client:
+    Checks HTTP/2 is enabled on the OPA client only when configured.
+25. test_create_opa_client_uds:
+    Checks the OPA client can send requests through a Unix domain socket.
+26. test_create_opa_cache:
+    Checks the OPA cache TTL is configurable and 0 disables the cache.
+27. test_get_auth_dependencies:
+    Checks the auth dependencies matching the configured modes are returned.
+28. test_auth_dependencies_from_settings:
+    Checks the module level auth dependencies are chosen from the settings.
+29. test_flaat_authentication:
+    Checks the flaat dependency delegates to check_flaat_authentication.
+30. test_jwt_authentication:
+    Checks the JWT dependency delegates to check_jwt_authentication.
+31. test_jwt_authentication_route:
+    Checks a route depending on the JWT dependency validates the bearer token.
+32. test_no_authentication:
+    Checks no user information is returned when authentication is disabled.
+33. test_no_authorization:
+    Checks authenticated users are allowed when authorization is disabled.
+34. test_opa_authorization:
+    Checks the OPA dependency delegates to check_opa_authorization.
 """
 
-from typing import ClassVar
-from unittest.mock import MagicMock, patch
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Annotated, ClassVar
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
 
+import httpx
+import jwt
+import orjson
 import pytest
-import requests
-from fastapi import HTTPException, status
+from cachetools import TTLCache
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, HTTPException, Security, status
 from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
 from flaat.exceptions import FlaatUnauthenticated
 from flaat.user_infos import UserInfos
 
 import app.auth as auth
-from app.config import AuthenticationMethodsEnum, AuthorizationMethodsEnum
+from app.config import (
+    AuthenticationMethodsEnum,
+    AuthorizationMethodsEnum,
+    get_settings,
+)
 
 
 class DummySettings:
@@ -53,30 +108,86 @@ class DummySettings:
     AUTHZ_MODE = None
     TRUSTED_IDP_LIST: ClassVar[list[str]] = ["https://idp.example.com"]
     OPA_AUTHZ_URL = "http://opa:8181/v1/data/example/allow"
+    OPA_CACHE_TTL = 5
+    OPA_HTTP2 = False
+    OPA_UDS_PATH = None
+    JWT_AUDIENCE = None
+
+
+LOGGED_MESSAGES = 64
 
 
 class DummyLogger:
     """A dummy logger class for capturing log messages during tests."""
 
     def __init__(self):
-        """Initialize lists to capture log messages."""
-        self.infos = []
-        self.warnings = []
-        self.debugs = []
+        """Initialize bounded queues keeping the latest log messages."""
+        self.infos = deque(maxlen=LOGGED_MESSAGES)
+        self.warnings = deque(maxlen=LOGGED_MESSAGES)
+        self.debugs = deque(maxlen=LOGGED_MESSAGES)
 
     def info(self, msg, *args):
         """Capture info log messages."""
         self.infos.append((msg, args))
 
-    def warning(self, msg):
+    def warning(self, msg, *args):
         """Capture warning log messages."""
         self.warnings.append(msg)
 
-    def debug(self, msg):
+    def debug(self, msg, *args):
         """Capture debug log messages."""
         self.debugs.append(msg)
 
 
+def _make_resp(code, body=None):
+    """Build a fake OPA response with the given status code and JSON body."""
+    resp = MagicMock()
+    resp.status_code = code
+    resp.json.return_value = body or {}
+    return resp
+
+
+@pytest.fixture(autouse=True)
+def clear_user_infos_cache():
+    """Fixture that empties the user infos and JWKS clients caches around each test."""
+    auth.user_infos_cache.clear()
+    auth.jwks_clients.clear()
+    auth.jwks_failures.clear()
+    yield
+    auth.user_infos_cache.clear()
+    auth.jwks_clients.clear()
+    auth.jwks_failures.clear()
+
+
+@pytest.fixture(scope="module")
+def rsa_key():
+    """Fixture that returns an RSA private key used to sign test tokens."""
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def jwt_creds(rsa_key):
+    """Fixture that returns credentials with a JWT signed by a trusted issuer."""
+    claims = {
+        "iss": "https://idp.example.com/",
+        "sub": "user1",
+        "email": "user1@example.com",
+        "exp": int(time.time()) + 300,
+    }
+    token = jwt.encode(claims, rsa_key, algorithm="RS256", headers={"kid": "k1"})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.fixture
+def jwks_client(rsa_key):
+    """Fixture that registers a JWKS client for the trusted issuer."""
+    client = MagicMock()
+    client.get_signing_key.return_value.key = rsa_key.public_key()
+    client.get_signing_key_from_jwt.return_value.key = rsa_key.public_key()
+    auth.jwks_clients["https://idp.example.com"] = client
+    return client
+
+
 @pytest.fixture
 def logger():
     """Fixture that returns a DummyLogger instance."""
@@ -89,6 +200,18 @@ def settings():
     return DummySettings()
 
 
+@pytest.fixture
+def opa_request(logger):
+    """Fixture that returns a GET request with a body and no OPA decisions cache."""
+    request = MagicMock()
+    request.headers = {"content-length": "4"}
+    request.url.path = "/test"
+    request.method = "GET"
+    request.state.logger = logger
+    request.state.opa_cache = None
+    return request
+
+
 @pytest.fixture
 def authz_creds():
     """Fixture that returns HTTPAuthorizationCredentials with a dummy token."""
@@ -103,11 +226,6 @@ def user_infos():
     )
 
 
-async def async_body():
-    """Return dummy request body data."""
-    return b"data"
-
-
 def test_configure_flaat_sets_trusted_idps(settings, logger):
     """Test that configure_flaat sets trusted IDPs and logs the info."""
     auth.configure_flaat(settings, logger)
@@ -152,182 +270,548 @@ def test_check_flaat_authentication_failure(mock_get_user_infos, authz_creds, lo
     assert exc.value.status_code == status.HTTP_403_FORBIDDEN
 
 
-@patch("app.auth.check_flaat_authentication")
-def test_check_authentication_local(
-    mock_check, authz_creds, settings, user_infos, logger
+@patch.object(auth.flaat, "get_user_infos_from_access_token")
+def test_check_flaat_authentication_cached(
+    mock_get_user_infos, authz_creds, logger, user_infos
 ):
-    """Test that check_authentication returns user when local authentication is used."""
-    settings.AUTHN_MODE = auth.AuthenticationMethodsEnum.local
-    request = MagicMock()
-    request.state.logger = logger
-    mock_check.return_value = user_infos
-    result = auth.check_authentication(request, authz_creds, settings)
-    assert result == user_infos
+    """Test that check_flaat_authentication reuses cached user infos."""
+    mock_get_user_infos.return_value = user_infos
+    assert auth.check_flaat_authentication(authz_creds, logger) == user_infos
+    assert auth.check_flaat_authentication(authz_creds, logger) == user_infos
+    mock_get_user_infos.assert_called_once_with("token")
+    assert "User infos retrieved from cache" in logger.debugs
+    assert auth.hash_token("token") in auth.user_infos_cache
+    assert "token" not in auth.user_infos_cache
 
 
-def test_check_authentication_none(authz_creds, settings, logger):
-    """Test that check_authentication returns None when authentication mode is None."""
-    settings.AUTHN_MODE = None
-    request = MagicMock()
-    request.state.logger = logger
-    result = auth.check_authentication(request, authz_creds, settings)
-    assert result is None
+@patch.object(auth.flaat, "get_user_infos_from_access_token")
+def test_check_flaat_authentication_failure_not_cached(
+    mock_get_user_infos, authz_creds, logger, user_infos
+):
+    """Test that check_flaat_authentication does not cache failures."""
+    mock_get_user_infos.side_effect = [FlaatUnauthenticated("fail"), user_infos]
+    with pytest.raises(HTTPException):
+        auth.check_flaat_authentication(authz_creds, logger)
+    assert len(auth.user_infos_cache) == 0
+    assert auth.check_flaat_authentication(authz_creds, logger) == user_infos
+    assert mock_get_user_infos.call_count == 2
 
 
-@pytest.mark.asyncio
-@patch("requests.post")
-async def test_check_opa_authorization_allow(mock_post, user_infos, settings, logger):
-    """Test that check_opa_authorization allows access when OPA returns allow=True."""
+def test_user_infos_time_to_use(user_infos):
+    """Test that cached user infos expire no later than the access token."""
+    now = 1000.0
+    assert (
+        auth.user_infos_time_to_use(b"key", user_infos, now)
+        == now + auth.USER_INFOS_CACHE_TTL
+    )
+    with patch.object(
+        UserInfos, "valid_for_secs", new_callable=PropertyMock, return_value=5
+    ):
+        assert auth.user_infos_time_to_use(b"key", user_infos, now) == now + 5
+    with patch.object(
+        UserInfos, "valid_for_secs", new_callable=PropertyMock, return_value=3600
+    ):
+        assert (
+            auth.user_infos_time_to_use(b"key", user_infos, now)
+            == now + auth.USER_INFOS_CACHE_TTL
+        )
 
-    class DummyResp:
-        status_code = status.HTTP_200_OK
 
-        def json(self):
-            return {"result": {"allow": True}}
+def test_check_jwt_authentication_success(jwt_creds, jwks_client, settings, logger):
+    """Test that check_jwt_authentication validates the token offline."""
+    with patch.object(auth.flaat, "get_user_infos_from_access_token") as mock_flaat:
+        result = auth.check_jwt_authentication(jwt_creds, settings, logger)
+        assert auth.check_jwt_authentication(jwt_creds, settings, logger) is result
+    mock_flaat.assert_not_called()
+    jwks_client.get_signing_key.assert_called_once_with("k1")
+    jwks_client.get_signing_key_from_jwt.assert_not_called()
+    assert result.subject == "user1"
+    assert result.issuer == "https://idp.example.com/"
+    assert result.user_info["email"] == "user1@example.com"
+    assert 0 < result.valid_for_secs <= 300
+    assert "User infos retrieved from cache" in logger.debugs
 
-    request = MagicMock()
-    request.body = async_body
-    request.url.path = "/test"
-    request.method = "GET"
 
-    mock_post.return_value = DummyResp()
+def test_check_jwt_authentication_invalid_signature(
+    jwt_creds, jwks_client, settings, logger
+):
+    """Test that check_jwt_authentication raises 403 if the signature is invalid."""
+    other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwks_client.get_signing_key.return_value.key = other_key.public_key()
+    with pytest.raises(HTTPException) as exc:
+        auth.check_jwt_authentication(jwt_creds, settings, logger)
+    assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+    assert len(auth.user_infos_cache) == 0
 
-    await auth.check_opa_authorization(
-        request=request, user_infos=user_infos, settings=settings, logger=logger
+
+def test_check_jwt_authentication_without_kid(rsa_key, jwks_client, settings, logger):
+    """Test that the signing key is inferred from the token when there is no kid."""
+    claims = {"iss": "https://idp.example.com", "sub": "user1", "exp": time.time() + 60}
+    token = jwt.encode(claims, rsa_key, algorithm="RS256")
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    assert auth.check_jwt_authentication(creds, settings, logger).subject == "user1"
+    jwks_client.get_signing_key_from_jwt.assert_called_once_with(token)
+    jwks_client.get_signing_key.assert_not_called()
+
+
+def test_check_jwt_authentication_missing_claims(
+    rsa_key, jwks_client, settings, logger
+):
+    """Test that check_jwt_authentication raises 403 if required claims are missing."""
+    token = jwt.encode({"iss": "https://idp.example.com"}, rsa_key, algorithm="RS256")
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    with pytest.raises(HTTPException) as exc:
+        auth.check_jwt_authentication(creds, settings, logger)
+    assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.parametrize(
+    "aud,expected_aud,allowed",
+    [
+        ("api", None, True),
+        ("api", "api", True),
+        ("other", "api", False),
+        (None, "api", False),
+    ],
+    ids=["not-verified", "match", "mismatch", "missing"],
+)
+def test_check_jwt_authentication_audience(
+    aud, expected_aud, allowed, rsa_key, jwks_client, settings, logger
+):
+    """Test that the audience is verified only when JWT_AUDIENCE is defined."""
+    claims = {"iss": "https://idp.example.com", "sub": "user1", "exp": time.time() + 60}
+    if aud is not None:
+        claims["aud"] = aud
+    token = jwt.encode(claims, rsa_key, algorithm="RS256", headers={"kid": "k1"})
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    settings.JWT_AUDIENCE = expected_aud
+    if allowed:
+        assert auth.check_jwt_authentication(creds, settings, logger).subject == "user1"
+    else:
+        with pytest.raises(HTTPException) as exc:
+            auth.check_jwt_authentication(creds, settings, logger)
+        assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+
+
+@patch("app.auth.httpx.get")
+def test_check_jwt_authentication_keys_unreachable(
+    mock_get, jwt_creds, jwks_client, settings, logger
+):
+    """Test that an issuer whose keys can't be fetched is skipped for a while."""
+    jwks_client.get_signing_key.side_effect = jwt.PyJWKClientConnectionError("down")
+    with pytest.raises(HTTPException) as exc:
+        auth.check_jwt_authentication(jwt_creds, settings, logger)
+    assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+    assert auth.jwks_clients == {}
+    assert "https://idp.example.com" in auth.jwks_failures
+    assert auth.get_jwks_client("https://idp.example.com", settings, logger) is None
+    mock_get.assert_not_called()
+
+
+@pytest.mark.parametrize("token", ["opaque-token", "jwt"])
+@patch("app.auth.check_flaat_authentication")
+def test_check_jwt_authentication_fallback(
+    mock_check, token, rsa_key, settings, logger, user_infos
+):
+    """Test that opaque tokens and untrusted issuers are delegated to flaat."""
+    if token == "jwt":
+        token = jwt.encode({"iss": "https://other.example.com"}, rsa_key, "RS256")
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    mock_check.return_value = user_infos
+    assert auth.check_jwt_authentication(creds, settings, logger) == user_infos
+    mock_check.assert_called_once_with(authz_creds=creds, logger=logger)
+
+
+@patch("app.auth.httpx.get")
+def test_get_jwks_client(mock_get, settings, logger):
+    """Test that get_jwks_client discovers the JWKS URI once per trusted issuer."""
+    mock_get.return_value.json.return_value = {
+        "jwks_uri": "https://idp.example.com/jwk"
+    }
+    client = auth.get_jwks_client("https://idp.example.com/", settings, logger)
+    assert isinstance(client, jwt.PyJWKClient)
+    assert client.uri == "https://idp.example.com/jwk"
+    assert auth.get_jwks_client("https://idp.example.com", settings, logger) is client
+    mock_get.assert_called_once_with(
+        "https://idp.example.com/.well-known/openid-configuration",
+        timeout=auth.IDP_TIMEOUT,
     )
-    assert "Authorization through OPA" in logger.debugs
-    assert "Sending user's data to OPA" in logger.debugs
+    assert auth.get_jwks_client("https://other.example.com", settings, logger) is None
 
 
-@pytest.mark.asyncio
-@patch("requests.post")
-async def test_check_opa_authorization_deny(mock_post, user_infos, settings, logger):
-    """Test that check_opa_authorization denies access when OPA returns allow=False."""
+@patch("app.auth.httpx.get")
+def test_get_jwks_client_discovery_failure(mock_get, settings, logger):
+    """Test that get_jwks_client returns None if the IDP configuration is missing.
 
-    class DummyResp:
-        status_code = status.HTTP_200_OK
+    The failure is cached, so the issuer is not contacted again until it expires.
+    """
+    mock_get.side_effect = httpx.ConnectError("connection refused")
+    assert auth.get_jwks_client("https://idp.example.com", settings, logger) is None
+    assert auth.get_jwks_client("https://idp.example.com", settings, logger) is None
+    mock_get.assert_called_once()
+    assert len(logger.warnings) == 1
+    assert auth.jwks_clients == {}
+    auth.jwks_failures.clear()
+    assert auth.get_jwks_client("https://idp.example.com", settings, logger) is None
+    assert mock_get.call_count == 2
 
-        def json(self):
-            return {"result": {"allow": False}}
 
-    request = MagicMock()
-    request.body = async_body
-    request.url.path = "/test"
-    request.method = "GET"
+@pytest.mark.asyncio
+async def test_check_opa_authorization_allow(user_infos, settings, logger, opa_request):
+    """Test that check_opa_authorization allows access when OPA returns allow=True."""
+    request = opa_request
+    request.state.opa_client.post = AsyncMock(
+        return_value=_make_resp(status.HTTP_200_OK, {"result": {"allow": True}})
+    )
+
+    await auth.check_opa_authorization(
+        request=request,
+        token="token",
+        user_infos=user_infos,
+        settings=settings,
+        logger=logger,
+    )
+    assert "Authorization through OPA" in logger.debugs
+    assert "Sending user's data to OPA" in logger.debugs
 
-    mock_post.return_value = DummyResp()
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "code,body,expected_code,detail",
+    [
+        (
+            status.HTTP_200_OK,
+            {"result": {"allow": False}},
+            status.HTTP_401_UNAUTHORIZED,
+            "Unauthorized",
+        ),
+        (
+            status.HTTP_400_BAD_REQUEST,
+            None,
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "Bad request",
+        ),
+        (
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            None,
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "internal error",
+        ),
+        (
+            status.HTTP_418_IM_A_TEAPOT,
+            None,
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "unexpected response code",
+        ),
+    ],
+    ids=["deny", "bad_request", "internal_error", "unexpected_status"],
+)
+async def test_check_opa_authorization_rejected(
+    code, body, expected_code, detail, user_infos, settings, logger, opa_request
+):
+    """Test check_opa_authorization raises HTTPException on deny or OPA errors."""
+    request = opa_request
+    request.state.opa_client.post = AsyncMock(return_value=_make_resp(code, body))
     with pytest.raises(HTTPException) as exc:
         await auth.check_opa_authorization(
-            request=request, user_infos=user_infos, settings=settings, logger=logger
+            request=request,
+            token="token",
+            user_infos=user_infos,
+            settings=settings,
+            logger=logger,
         )
-    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert exc.value.status_code == expected_code
+    assert detail in exc.value.detail
 
 
 @pytest.mark.asyncio
-@patch("requests.post")
-async def test_check_opa_authorization_bad_request(
-    mock_post, user_infos, settings, logger
+async def test_check_opa_authorization_timeout(
+    user_infos, settings, logger, opa_request
 ):
-    """Test that check_opa_authorization raises HTTPException on OPA bad request."""
-
-    class DummyResp:
-        status_code = status.HTTP_400_BAD_REQUEST
-
-    request = MagicMock()
-    request.body = async_body
-    request.url.path = "/test"
-    request.method = "GET"
-
-    mock_post.return_value = DummyResp()
-
+    """Test that check_opa_authorization raises HTTPException on OPA timeout."""
+    request = opa_request
+    request.state.opa_client.post = AsyncMock(
+        side_effect=httpx.TimeoutException("timeout")
+    )
     with pytest.raises(HTTPException) as exc:
         await auth.check_opa_authorization(
-            request=request, user_infos=user_infos, settings=settings, logger=logger
+            request=request,
+            token="token",
+            user_infos=user_infos,
+            settings=settings,
+            logger=logger,
         )
     assert exc.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
 
 
 @pytest.mark.asyncio
-@patch("requests.post")
-async def test_check_opa_authorization_internal_error(
-    mock_post, user_infos, settings, logger
+async def test_check_opa_authorization_unreachable(
+    user_infos, settings, logger, opa_request
 ):
-    """Test check_opa_authorization raises HTTPException on OPA internal server err."""
-
-    class DummyResp:
-        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-
-    request = MagicMock()
-    request.body = async_body
-    request.url.path = "/test"
-    request.method = "GET"
-
-    mock_post.return_value = DummyResp()
-
+    """Test that check_opa_authorization raises HTTPException on connection errors."""
+    request = opa_request
+    request.state.opa_client.post = AsyncMock(
+        side_effect=httpx.ConnectError("connection refused")
+    )
     with pytest.raises(HTTPException) as exc:
         await auth.check_opa_authorization(
-            request=request, user_infos=user_infos, settings=settings, logger=logger
+            request=request,
+            token="token",
+            user_infos=user_infos,
+            settings=settings,
+            logger=logger,
         )
     assert exc.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert "not reachable" in exc.value.detail
 
 
 @pytest.mark.asyncio
-@patch("requests.post")
-async def test_check_opa_authorization_unexpected_status(
-    mock_post, user_infos, settings, logger
+@pytest.mark.parametrize("allow", [True, False])
+async def test_check_opa_authorization_cached(
+    allow, user_infos, settings, logger, opa_request
 ):
-    """Test check_opa_authorization raises HTTPException on unexpected status code."""
+    """Test that check_opa_authorization caches both allow and deny decisions."""
+    request = opa_request
+    request.state.opa_cache = TTLCache(maxsize=10, ttl=60)
+    request.state.opa_client.post = AsyncMock(
+        return_value=_make_resp(status.HTTP_200_OK, {"result": {"allow": allow}})
+    )
 
-    class DummyResp:
-        status_code = status.HTTP_418_IM_A_TEAPOT  # I'm a teapot (unexpected)
+    for _ in range(2):
+        if allow:
+            await auth.check_opa_authorization(
+                request=request,
+                token="token",
+                user_infos=user_infos,
+                settings=settings,
+                logger=logger,
+            )
+        else:
+            with pytest.raises(HTTPException) as exc:
+                await auth.check_opa_authorization(
+                    request=request,
+                    token="token",
+                    user_infos=user_infos,
+                    settings=settings,
+                    logger=logger,
+                )
+            assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert request.state.opa_client.post.await_count == 1
+    assert "OPA decision retrieved from cache" in logger.debugs
+    assert list(request.state.opa_cache.values()) == [allow]
+    key = next(iter(request.state.opa_cache))
+    assert key == (auth.hash_token("token")[:16], "GET", "/test", True)
 
-    request = MagicMock()
-    request.body = async_body
-    request.url.path = "/test"
-    request.method = "GET"
-    mock_post.return_value = DummyResp()
-    with pytest.raises(HTTPException) as exc:
-        await auth.check_opa_authorization(
-            request=request, user_infos=user_infos, settings=settings, logger=logger
-        )
-    assert exc.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-    assert "unexpected response code" in exc.value.detail
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "headers,has_body",
+    [
+        ({}, False),
+        ({"content-length": "0"}, False),
+        ({"content-length": "10"}, True),
+        ({"content-length": "abc"}, True),
+        ({"content-length": ""}, True),
+        ({"transfer-encoding": "chunked"}, True),
+    ],
+)
+async def test_check_opa_authorization_has_body(
+    headers, has_body, user_infos, settings, logger, opa_request
+):
+    """Test that check_opa_authorization detects the body from the headers."""
+    request = opa_request
+    request.headers = headers
+    request.method = "POST"
+    request.state.opa_client.post = AsyncMock(
+        return_value=_make_resp(status.HTTP_200_OK, {"result": {"allow": True}})
+    )
+    await auth.check_opa_authorization(
+        request=request,
+        token="token",
+        user_infos=user_infos,
+        settings=settings,
+        logger=logger,
+    )
+    kwargs = request.state.opa_client.post.call_args.kwargs
+    assert kwargs["headers"] == {"Content-Type": "application/json"}
+    data = orjson.loads(kwargs["content"])
+    assert data["input"]["has_body"] is has_body
+    request.body.assert_not_called()
 
 
 @pytest.mark.asyncio
-@patch("requests.post", side_effect=requests.Timeout)
-async def test_check_opa_authorization_timeout(mock_post, user_infos, settings, logger):
-    """Test that check_opa_authorization raises HTTPException on OPA timeout."""
-    request = MagicMock()
-    request.body = async_body
-    request.url.path = "/test"
-    request.method = "GET"
-    with pytest.raises(HTTPException) as exc:
+async def test_check_opa_authorization_error_not_cached(
+    user_infos, settings, logger, opa_request
+):
+    """Test that check_opa_authorization does not cache OPA failures."""
+    request = opa_request
+    request.state.opa_cache = TTLCache(maxsize=10, ttl=60)
+    request.state.opa_client.post = AsyncMock(
+        side_effect=httpx.TimeoutException("timeout")
+    )
+    with pytest.raises(HTTPException):
         await auth.check_opa_authorization(
-            request=request, user_infos=user_infos, settings=settings, logger=logger
+            request=request,
+            token="token",
+            user_infos=user_infos,
+            settings=settings,
+            logger=logger,
         )
-    assert exc.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert len(request.state.opa_cache) == 0
 
 
 @pytest.mark.asyncio
-@patch("app.auth.check_opa_authorization")
-async def test_check_authorization_opa(mock_check_opa, user_infos, settings, logger):
-    """Test that check_authorization calls OPA authorization when mode is set to OPA."""
-    settings.AUTHZ_MODE = auth.AuthorizationMethodsEnum.opa
+@pytest.mark.parametrize("http2", [True, False])
+async def test_create_opa_client(http2, settings):
+    """Test that create_opa_client enables HTTP/2 only when configured."""
+    settings.OPA_HTTP2 = http2
+    async with auth.create_opa_client(settings) as client:
+        assert isinstance(client, httpx.AsyncClient)
+        assert client._transport._pool._http2 is http2
+        assert client._transport._pool._uds is None
+
+
+@pytest.mark.asyncio
+async def test_create_opa_client_uds(settings, tmp_path):
+    """Test that create_opa_client sends requests through the OPA Unix socket."""
+    socket_path = str(tmp_path / "opa.sock")
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        body = b'{"result": {"allow": true}}'
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+        )
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_unix_server(handle, path=socket_path)
+    settings.OPA_UDS_PATH = socket_path
+    async with server, auth.create_opa_client(settings) as client:
+        resp = await client.post(settings.OPA_AUTHZ_URL, json={})
+    assert resp.json() == {"result": {"allow": True}}
+
+
+def test_create_opa_cache(settings):
+    """Test that create_opa_cache uses the configured TTL or disables the cache."""
+    settings.OPA_CACHE_TTL = 7
+    cache = auth.create_opa_cache(settings)
+    assert isinstance(cache, TTLCache)
+    assert cache.ttl == 7
+    settings.OPA_CACHE_TTL = 0
+    assert auth.create_opa_cache(settings) is None
+
+
+@pytest.mark.parametrize(
+    "authn_mode,authz_mode,authentication,authorization",
+    [
+        (None, None, auth.no_authentication, auth.no_authorization),
+        (
+            AuthenticationMethodsEnum.local,
+            None,
+            auth.flaat_authentication,
+            auth.no_authorization,
+        ),
+        (
+            AuthenticationMethodsEnum.jwt,
+            AuthorizationMethodsEnum.opa,
+            auth.jwt_authentication,
+            auth.opa_authorization,
+        ),
+    ],
+)
+def test_get_auth_dependencies(
+    authn_mode, authz_mode, authentication, authorization, settings
+):
+    """Test that the auth dependencies matching the configured modes are returned."""
+    settings.AUTHN_MODE = authn_mode
+    settings.AUTHZ_MODE = authz_mode
+    assert auth.get_authentication_dependency(settings) is authentication
+    assert auth.get_authorization_dependency(settings) is authorization
+
+
+def test_auth_dependencies_from_settings():
+    """Test that the module level auth dependencies match the application settings."""
+    settings = get_settings()
+    assert auth.check_authentication is auth.get_authentication_dependency(settings)
+    assert auth.check_authorization is auth.get_authorization_dependency(settings)
+
+
+@patch("app.auth.check_flaat_authentication")
+def test_flaat_authentication(mock_check, authz_creds, user_infos, logger):
+    """Test that flaat_authentication delegates to check_flaat_authentication."""
     request = MagicMock()
     request.state.logger = logger
-    mock_check_opa.return_value = None
-    result = await auth.check_authorization(request, user_infos, settings)
-    assert result is None
+    mock_check.return_value = user_infos
+    assert auth.flaat_authentication(request, authz_creds) == user_infos
+    mock_check.assert_called_once_with(authz_creds=authz_creds, logger=logger)
 
 
-@pytest.mark.asyncio
-async def test_check_authorization_none(user_infos, settings, logger):
-    """Test that check_authorization does not raise when authorization mode is None."""
-    settings.AUTHZ_MODE = None
+@patch("app.auth.check_jwt_authentication")
+def test_jwt_authentication(mock_check, authz_creds, settings, user_infos, logger):
+    """Test that jwt_authentication delegates to check_jwt_authentication."""
     request = MagicMock()
     request.state.logger = logger
-    # Should not raise
-    result = await auth.check_authorization(request, user_infos, settings)
-    assert result is None
+    mock_check.return_value = user_infos
+    assert auth.jwt_authentication(request, authz_creds, settings) == user_infos
+    mock_check.assert_called_once_with(
+        authz_creds=authz_creds, settings=settings, logger=logger
+    )
+
+
+def test_jwt_authentication_route(jwt_creds, jwks_client, settings, logger):
+    """Test that a route depending on jwt_authentication validates the bearer JWT."""
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield {"logger": logger}
+
+    app = FastAPI(lifespan=lifespan)
+    app.dependency_overrides[get_settings] = lambda: settings
+
+    @app.get("/")
+    def whoami(
+        user_infos: Annotated[UserInfos, Security(auth.jwt_authentication)],
+    ) -> dict:
+        """Return the subject of the authenticated user."""
+        return {"sub": user_infos.subject}
+
+    with TestClient(app) as client:
+        headers = {"Authorization": f"Bearer {jwt_creds.credentials}"}
+        resp = client.get("/", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json() == {"sub": "user1"}
+        other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwks_client.get_signing_key.return_value.key = other_key.public_key()
+        auth.user_infos_cache.clear()
+        resp = client.get("/", headers=headers)
+        assert resp.status_code == 403
+        assert client.get("/").status_code == 403
+
+
+def test_no_authentication(authz_creds):
+    """Test that no_authentication returns no user information."""
+    assert auth.no_authentication(authz_creds) is None
+
+
+@pytest.mark.asyncio
+async def test_no_authorization(user_infos):
+    """Test that no_authorization allows any authenticated user."""
+    assert await auth.no_authorization(user_infos) is None
+
+
+@pytest.mark.asyncio
+@patch("app.auth.check_opa_authorization")
+async def test_opa_authorization(
+    mock_check_opa, authz_creds, user_infos, settings, logger, opa_request
+):
+    """Test that opa_authorization delegates to check_opa_authorization."""
+    await auth.opa_authorization(opa_request, authz_creds, user_infos, settings)
+    mock_check_opa.assert_awaited_once_with(
+        token="token",
+        user_infos=user_infos,
+        request=opa_request,
+        settings=settings,
+        logger=logger,
+    )
@@ -4,13 +4,15 @@ These tests cover:
 - LogLevelEnum and AuthorizationMethodsEnum values
 - get_level function for various input types
 - Settings model field defaults and types
+- Settings lists parsed from env vars as tuples
 - get_settings caching
+- Settings immutability
 """
 
 import logging
 
 import pytest
-from pydantic import AnyHttpUrl
+from pydantic import AnyHttpUrl, ValidationError
 
 from app.config import (
     AuthenticationMethodsEnum,
@@ -25,6 +27,7 @@ from app.config import (
 def test_authentication_methods_enum_values():
     """Test that AuthenticationMethodsEnum values are correct."""
     assert AuthenticationMethodsEnum.local == "local"
+    assert AuthenticationMethodsEnum.jwt == "jwt"
 
 
 def test_authorization_methods_enum_values():
@@ -74,8 +77,8 @@ def test_settings_defaults():
     assert isinstance(s.DB_URL, str)
     assert isinstance(s.OPA_AUTHZ_URL, str) or s.OPA_AUTHZ_URL is not None
     assert isinstance(s.DB_ECO, bool)
-    assert isinstance(s.TRUSTED_IDP_LIST, list)
-    assert isinstance(s.BACKEND_CORS_ORIGINS, list)
+    assert isinstance(s.TRUSTED_IDP_LIST, tuple)
+    assert isinstance(s.BACKEND_CORS_ORIGINS, tuple)
 
 
 def test_get_settings_caching():
@@ -85,6 +88,23 @@ def test_get_settings_caching():
     assert s1 is s2
 
 
+def test_settings_lists_from_env(monkeypatch):
+    """Test that list settings are read from JSON env vars as hashable tuples."""
+    monkeypatch.setenv("TRUSTED_IDP_LIST", '["https://idp.example.com"]')
+    monkeypatch.setenv("BACKEND_CORS_ORIGINS", '["*"]')
+    s = Settings()
+    assert s.TRUSTED_IDP_LIST == (AnyHttpUrl("https://idp.example.com"),)
+    assert s.BACKEND_CORS_ORIGINS == ("*",)
+    assert hash(s) == hash(Settings())
+
+
+def test_settings_are_frozen():
+    """Test that Settings attributes can't be changed after creation."""
+    s = Settings()
+    with pytest.raises(ValidationError):
+        s.DB_ECO = True
+
+
 def test_settings_authz_without_authn_raises():
     """Test that ValueError is raised if AUTHZ_MODE is set but AUTHN_MODE is None."""
     with pytest.raises(ValueError) as exc:
@@ -1,50 +1,159 @@
 """Unit tests for v1 common crud functions.
 
 These tests cover:
+- get_columns per entity caching
+- get_filters per entity caching
 - get_conditions for various filter types
-- get_item, get_items, add_item, delete_item logic with mocks
+- get_item, get_items, add_item, add_items, delete_item logic with mocks
+- get_item and get_items relationship loading on an in-memory SQLite DB
+- parse_integrity_error and raise_from_integrity_error with NOT NULL, single and
+  composite UNIQUE constraints, from SQLite messages or driver diagnostics
 """
 
+import itertools
+import operator
 import uuid
+from dataclasses import dataclass
+from types import SimpleNamespace
+from unittest import mock
 from unittest.mock import MagicMock
 
 import pytest
 import sqlalchemy
-from sqlmodel import Field, SQLModel
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import selectinload
+from sqlmodel import Field, Relationship, SQLModel
 
 from app.exceptions import ConflictError, NoItemToUpdateError, NotNullError
 from app.v1.crud import (
+    DEFAULT_LOADER_OPTIONS,
     add_item,
+    add_items,
     delete_item,
+    get_columns,
     get_conditions,
+    get_filters,
     get_item,
     get_items,
+    parse_integrity_error,
     raise_from_integrity_error,
     update_item,
 )
+from app.v1.users.schemas import User
 
 
 class DummyEntity(SQLModel, table=True):
     """Dummy SQLModel entity for testing CRUD utility functions."""
 
     __name__ = "DummyEntity"
+    __table_args__ = (
+        sqlalchemy.CheckConstraint("value >= 0", name="non_negative_value"),
+    )
 
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: int | None = Field(default=None, primary_key=True)
     created_at: int = Field(default=0)
     updated_at: int = Field(default=0)
     name: str = Field(default="foo")
     value: int = Field(default=0)
 
 
+class DummyParent(SQLModel, table=True):
+    """Dummy SQLModel entity with a one-to-many relationship."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    created_at: int = Field(default=0)
+    children: list["DummyChild"] = Relationship(back_populates="parent")
+
+
+class DummyChild(SQLModel, table=True):
+    """Dummy SQLModel entity with a many-to-one relationship."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    parent_id: int | None = Field(default=None, foreign_key="dummyparent.id")
+    parent: DummyParent | None = Relationship(back_populates="children")
+
+
+@pytest.fixture
+def parent_session(db_session):
+    """Return a DB session where a parent and its child have been stored."""
+    SQLModel.metadata.create_all(
+        db_session.get_bind(), tables=[DummyParent.__table__, DummyChild.__table__]
+    )
+    db_session.add(DummyParent(id=1, children=[DummyChild(id=1)]))
+    db_session.commit()
+    db_session.expunge_all()
+    return db_session
+
+
+@dataclass
+class StubItem:
+    """Lightweight stand-in for a pydantic model exposing only model_dump."""
+
+    payload: dict
+
+    def model_dump(self, **kwargs):
+        """Return the stored payload, ignoring the dump options."""
+        return self.payload
+
+
+def _integrity_error(msg):
+    """Build an IntegrityError wrapping a driver error with the given message."""
+    exc = sqlalchemy.exc.IntegrityError(
+        statement=None, params=None, orig=Exception(msg)
+    )
+    exc.args = (msg,)
+    return exc
+
+
+_item_ids = itertools.count(1)
+
+
+@pytest.fixture
+def stub_entity():
+    """Return DummyEntity with a no-op constructor, restored after the test."""
+    with mock.patch.object(DummyEntity, "__init__", lambda self, **kwargs: None):
+        yield DummyEntity
+
+
 @pytest.fixture
 def item_id():
-    """Generate and return a new unique user ID using UUID version 4.
+    """Generate and return a new unique item ID.
 
     Returns:
-        uuid.UUID: A randomly generated UUID object representing a unique user ID.
+        int: An integer never returned before during the test session.
 
     """
-    return uuid.uuid4()
+    return next(_item_ids)
+
+
+def test_get_columns_cached():
+    """Test get_columns maps column names to the table columns once per entity."""
+    columns = get_columns(DummyEntity)
+    assert set(columns) == {"id", "created_at", "updated_at", "name", "value"}
+    assert columns["name"] is DummyEntity.__table__.c.name
+    assert get_columns(DummyEntity) is columns
+
+
+def test_get_filters_cached():
+    """Test get_filters builds the filters table once per entity."""
+    filters = get_filters(DummyEntity)
+    col = DummyEntity.__table__.c.value
+    assert filters["value"] == (col, None)
+    assert filters["value_lte"] == (col, operator.le)
+    assert filters["value_gte"] == (col, operator.ge)
+    assert filters["created_before"] == (
+        DummyEntity.__table__.c.created_at,
+        operator.le,
+    )
+    assert get_filters(DummyEntity) is filters
+    assert "created_before" in get_filters(User)
+    assert "updated_before" not in get_filters(User)
+
+
+def test_get_conditions_unknown_filter():
+    """Test get_conditions raises KeyError for filters not matching any field."""
+    with pytest.raises(KeyError):
+        get_conditions(entity=DummyEntity, missing="bar")
 
 
 def test_get_conditions_str_and_numeric():
@@ -52,11 +161,21 @@ def test_get_conditions_str_and_numeric():
     conds = get_conditions(
         entity=DummyEntity, name="bar", value=5, value_gte=1, value_lte=10
     )
-    conds = [str(c) for c in conds]
-    assert "lower(dummyentity.name) LIKE '%' || lower(:name_1) || '%'" in conds
-    assert "dummyentity.value <= :value_1" in conds
-    assert "dummyentity.value >= :value_1" in conds
-    assert "dummyentity.value = :value_1" in conds
+    cols = DummyEntity.__table__.c
+    expected = [
+        cols.name.icontains("bar"),
+        cols.value == 5,
+        cols.value >= 1,
+        cols.value <= 10,
+    ]
+    assert all(c.compare(e) for c, e in zip(conds, expected, strict=True))
+
+
+def test_get_conditions_str_uses_ilike_on_postgresql():
+    """Test string filters compile to ILIKE on PostgreSQL, usable by trigram indexes."""
+    (cond,) = get_conditions(entity=DummyEntity, name="bar")
+    compiled = str(cond.compile(dialect=postgresql.dialect()))
+    assert compiled == "dummyentity.name ILIKE '%%' || %(name_1)s || '%%'"
 
 
 def test_get_conditions_created_updated():
@@ -68,19 +187,77 @@ def test_get_conditions_created_updated():
         updated_before=3,
         updated_after=4,
     )
-    conds = [str(c) for c in conds]
-    assert "dummyentity.created_at <= :created_at_1" in conds
-    assert "dummyentity.created_at >= :created_at_1" in conds
-    assert "dummyentity.updated_at <= :updated_at_1" in conds
-    assert "dummyentity.updated_at >= :updated_at_1" in conds
+    cols = DummyEntity.__table__.c
+    expected = [
+        cols.created_at <= 1,
+        cols.created_at >= 2,
+        cols.updated_at <= 3,
+        cols.updated_at >= 4,
+    ]
+    assert all(c.compare(e) for c, e in zip(conds, expected, strict=True))
 
 
-def test_get_item_calls_session_exec(session, item_id):
-    """Test get_item calls session.exec and returns the first result."""
-    session.exec.return_value.first.return_value = "item"
+def test_get_item_calls_session_get(session, item_id):
+    """Test get_item looks up the item by primary key."""
+    session.get.return_value = "item"
     result = get_item(entity=DummyEntity, session=session, item_id=item_id)
     assert result == "item"
-    session.exec.assert_called()
+    session.get.assert_called_once_with(
+        DummyEntity, item_id, options=DEFAULT_LOADER_OPTIONS
+    )
+    session.exec.assert_not_called()
+
+
+def test_get_item_and_items_forward_loader_options(session, item_id):
+    """Test get_item and get_items apply the given loader options."""
+    opt = sqlalchemy.orm.raiseload("*")
+    get_item(entity=DummyEntity, session=session, item_id=item_id, options=[opt])
+    session.get.assert_called_once_with(DummyEntity, item_id, options=[opt])
+
+    session.exec.side_effect = [SimpleNamespace(all=lambda: [("item1", 1)])]
+    get_items(
+        entity=DummyEntity,
+        session=session,
+        skip=0,
+        limit=10,
+        sort="created_at",
+        options=[opt],
+    )
+    statement = session.exec.call_args_list[0][0][0]
+    assert statement._with_options == (opt,)
+
+
+def test_get_item_and_items_raise_on_lazy_load(parent_session):
+    """Test relationships not eagerly loaded can't be lazy loaded by default."""
+    parent = get_item(entity=DummyParent, session=parent_session, item_id=1)
+    with pytest.raises(sqlalchemy.exc.InvalidRequestError):
+        _ = parent.children
+    parent_session.expunge_all()
+    items, _ = get_items(
+        entity=DummyParent, session=parent_session, skip=0, limit=10, sort="created_at"
+    )
+    with pytest.raises(sqlalchemy.exc.InvalidRequestError):
+        _ = items[0].children
+
+
+def test_get_item_and_items_eager_load(parent_session):
+    """Test relationships are available when eagerly loaded with selectinload."""
+    options = [selectinload(DummyParent.children)]
+    parent = get_item(
+        entity=DummyParent, session=parent_session, item_id=1, options=options
+    )
+    assert [c.id for c in parent.children] == [1]
+    parent_session.expunge_all()
+    items, tot = get_items(
+        entity=DummyParent,
+        session=parent_session,
+        skip=0,
+        limit=10,
+        sort="created_at",
+        options=options,
+    )
+    assert tot == 1
+    assert [c.id for c in items[0].children] == [1]
 
 
 @pytest.mark.parametrize("order", ["ASC", "DESC"])
@@ -88,8 +265,7 @@ def test_get_items_exec_called_with_correct_statement(session, order):
     """Test get_items calls session.exec with correct select statement for items."""
     # Prepare mocks
     session.exec.side_effect = [
-        MagicMock(all=lambda: ["item1", "item2"]),
-        MagicMock(first=lambda: 2),
+        SimpleNamespace(all=lambda: [("item1", 2), ("item2", 2)])
     ]
     key = "created_at"
     if order == "DESC":
@@ -100,11 +276,10 @@ def test_get_items_exec_called_with_correct_statement(session, order):
         entity=DummyEntity, session=session, skip=5, limit=10, sort=key
     )
 
-    # Check the first call to session.exec
-    first_call_args = session.exec.call_args_list[0][0]
-    statement = first_call_args[0]
+    # Check the single call to session.exec
+    statement = session.exec.call_args_list[0][0][0]
     # The statement should be a select on DummyEntity with correct offset, limit, and
-    # order_by
+    # order_by and the total count as window function
     assert hasattr(statement, "offset")
     assert hasattr(statement, "limit")
     assert hasattr(statement, "order_by")
@@ -113,50 +288,120 @@ def test_get_items_exec_called_with_correct_statement(session, order):
     assert any(
         "created_at" in str(o) and order in str(o) for o in statement._order_by_clauses
     )
-
-    # Check the second call to session.exec (for count)
-    second_call_args = session.exec.call_args_list[1][0]
-    count_statement = second_call_args[0]
-    # The count statement should not have offset or limit
-    assert not getattr(count_statement, "_limit", None)
-    assert not getattr(count_statement, "_offset", None)
-    assert hasattr(statement, "order_by")
-    assert any(
-        "created_at" in str(o) and order in str(o) for o in statement._order_by_clauses
-    )
+    assert "count(*) OVER ()" in str(statement)
 
     assert items == ["item1", "item2"]
     assert tot == 2
+    assert session.exec.call_count == 1
+
+
+def test_get_items_empty_page_counts_items(session):
+    """Test get_items runs a count query only when the requested page is empty."""
+    session.exec.side_effect = [
+        SimpleNamespace(all=lambda: []),
+        SimpleNamespace(first=lambda: 7),
+    ]
+
+    items, tot = get_items(
+        entity=DummyEntity, session=session, skip=10, limit=5, sort="name", value=1
+    )
+
+    assert items == []
+    assert tot == 7
     assert session.exec.call_count == 2
+    count_statement = session.exec.call_args_list[1][0][0]
+    assert not getattr(count_statement, "_limit", None)
+    assert not getattr(count_statement, "_offset", None)
+    assert "count(dummyentity.id)" in str(count_statement)
+    assert "dummyentity.value = " in str(count_statement)
 
 
-def test_add_item_adds_and_commits(session, item_id):
+def test_add_item_adds_and_commits(session, item_id, stub_entity):
     """Test add_item adds the entity to the session and commits."""
-    item = MagicMock()
-    item.model_dump.return_value = {"id": item_id}
-    DummyEntity.__init__ = lambda self, **kwargs: None
+    item = StubItem({"id": item_id})
     # Pass created_by=None as required by new signature
-    result = add_item(entity=DummyEntity, session=session, item=item, created_by=None)
+    result = add_item(entity=stub_entity, session=session, item=item, created_by=None)
     session.add.assert_called()
     session.commit.assert_called()
     assert isinstance(result, DummyEntity)
 
 
-def test_add_item_with_created_by(session, item_id):
+def test_add_item_with_created_by(session, item_id, stub_entity):
     """Test add_item adds the entity with a non-None created_by user and commits."""
-    item = MagicMock()
-    item.model_dump.return_value = {"id": item_id}
-    DummyEntity.__init__ = lambda self, **kwargs: None
+    item = StubItem({"id": item_id})
     mock_user = MagicMock()
     mock_user.id = uuid.uuid4()
     result = add_item(
-        entity=DummyEntity, session=session, item=item, created_by=mock_user
+        entity=stub_entity, session=session, item=item, created_by=mock_user
     )
     session.add.assert_called()
     session.commit.assert_called()
     assert isinstance(result, DummyEntity)
 
 
+def test_add_items_adds_all_and_commits_once(session, stub_entity):
+    """Test add_items adds all the entities to the session with a single commit."""
+    items = [StubItem({"id": next(_item_ids)}) for _ in range(2)]
+    result = add_items(entity=stub_entity, session=session, items=items)
+    session.add_all.assert_called_once_with(result)
+    session.commit.assert_called_once()
+    assert len(result) == 2
+    assert all(isinstance(i, DummyEntity) for i in result)
+
+
+def test_add_items_does_not_expire_the_new_items(session, stub_entity):
+    """Test add_items commits without expiring the instances and restores the flag."""
+    session.expire_on_commit = True
+    flags = []
+    session.commit.side_effect = lambda: flags.append(session.expire_on_commit)
+    items = [StubItem({"id": next(_item_ids)}) for _ in range(2)]
+    add_items(entity=stub_entity, session=session, items=items)
+    assert flags == [False]
+    assert session.expire_on_commit is True
+
+
+def test_add_items_with_created_by(session, monkeypatch):
+    """Test add_items sets created_by on every entity and commits once."""
+    received = []
+    monkeypatch.setattr(
+        DummyEntity, "__init__", lambda self, **kwargs: received.append(kwargs)
+    )
+    items = [StubItem({"id": next(_item_ids)}) for _ in range(1000)]
+    user = MagicMock(id=uuid.uuid4())
+    result = add_items(
+        entity=DummyEntity, session=session, items=items, created_by=user
+    )
+    assert len(result) == 1000
+    assert all(kwargs["created_by"] == user.id for kwargs in received)
+    session.add_all.assert_called_once_with(result)
+    session.commit.assert_called_once()
+
+
+def test_add_items_raises_conflict_error(session, stub_entity):
+    """Test add_items raises ConflictError on UNIQUE constraint violation."""
+    item = StubItem({"id": next(_item_ids)})
+    session.expire_on_commit = True
+    session.commit.side_effect = _integrity_error(
+        "UNIQUE constraint failed: dummyentity.name"
+    )
+    with pytest.raises(ConflictError) as exc:
+        add_items(entity=stub_entity, session=session, items=[item, item])
+    assert "with the given name already exists" in str(exc.value)
+    session.rollback.assert_called_once()
+    assert session.expire_on_commit is True
+
+
+def test_add_items_reraises_other_integrity_errors(session, stub_entity):
+    """Test add_items re-raises the integrity errors that are not recognized."""
+    error = _integrity_error("FOREIGN KEY constraint failed")
+    session.commit.side_effect = error
+    items = [StubItem({"id": next(_item_ids)})]
+    with pytest.raises(sqlalchemy.exc.IntegrityError) as exc:
+        add_items(entity=stub_entity, session=session, items=items)
+    assert exc.value is error
+    session.rollback.assert_called_once()
+
+
 def test_delete_item_executes_and_commits(session, item_id):
     """Test delete_item executes the delete statement and commits."""
     delete_item(entity=DummyEntity, session=session, item_id=item_id)
@@ -164,46 +409,21 @@ def test_delete_item_executes_and_commits(session, item_id):
     session.commit.assert_called()
 
 
-def test_add_item_raises_not_null_error(session, item_id):
-    """Test add_item raises NotNullError on NOT NULL constraint violation."""
-    item = MagicMock()
-    item.model_dump.return_value = {"id": item_id}
-    DummyEntity.__init__ = lambda self, **kwargs: None
-
-    # Simulate IntegrityError for NOT NULL constraint
-    exc = sqlalchemy.exc.IntegrityError(
-        statement=None,
-        params=None,
-        orig=Exception("NOT NULL constraint failed: dummyentity.name"),
-    )
-    exc.args = ("NOT NULL constraint failed: dummyentity.name",)
-    session.add.side_effect = exc
+INTEGRITY_CASES = [
+    ("NOT NULL constraint failed: dummyentity.name", NotNullError, "can't be NULL"),
+    ("UNIQUE constraint failed: dummyentity.name", ConflictError, "already exists"),
+]
 
-    with pytest.raises(NotNullError) as e:
-        add_item(entity=DummyEntity, session=session, item=item, created_by=None)
-    assert "can't be NULL" in str(e.value)
-    session.rollback.assert_called_once()
-    session.commit.assert_not_called()
 
+@pytest.mark.parametrize("msg,exc,substr", INTEGRITY_CASES)
+def test_add_item_integrity(msg, exc, substr, session, item_id, stub_entity):
+    """Test add_item maps constraint violations to the matching API error."""
+    item = StubItem({"id": item_id, "name": "foo"})
+    session.add.side_effect = _integrity_error(msg)
 
-def test_add_item_raises_conflict_error(session, item_id):
-    """Test add_item raises ConflictError on UNIQUE constraint violation."""
-    item = MagicMock()
-    item.model_dump.return_value = {"id": item_id, "name": "foo"}
-    DummyEntity.__init__ = lambda self, **kwargs: None
-
-    # Simulate IntegrityError for UNIQUE constraint
-    exc = sqlalchemy.exc.IntegrityError(
-        statement=None,
-        params=None,
-        orig=Exception("UNIQUE constraint failed: dummyentity.name"),
-    )
-    exc.args = ("UNIQUE constraint failed: dummyentity.name",)
-    session.add.side_effect = exc
-
-    with pytest.raises(ConflictError) as e:
-        add_item(entity=DummyEntity, session=session, item=item, created_by=None)
-    assert "already exists" in str(e.value)
+    with pytest.raises(exc) as e:
+        add_item(entity=stub_entity, session=session, item=item, created_by=None)
+    assert substr in str(e.value)
     session.rollback.assert_called_once()
     session.commit.assert_not_called()
 
@@ -211,8 +431,7 @@ def test_add_item_raises_conflict_error(session, item_id):
 def test_raise_from_integrity_error_not_null(session, monkeypatch):
     """Test raise_from_integrity_error raises NotNullError on NOT NULL constraint."""
     # Patch split_camel_case to return a known value
-    item = MagicMock()
-    item.model_dump.return_value = {"name": "foo"}
+    item = StubItem({"name": "foo"})
     monkeypatch.setattr("app.v1.crud.split_camel_case", lambda x: "Dummy Entity")
     error = Exception("NOT NULL constraint failed: dummyentity.name")
     error.args = ("NOT NULL constraint failed: dummyentity.name",)
@@ -229,8 +448,7 @@ def test_raise_from_integrity_error_not_null(session, monkeypatch):
 
 def test_raise_from_integrity_error_unique(session, monkeypatch):
     """Test raise_from_integrity_error raises ConflictError on NOT UNIQUE constraint."""
-    item = MagicMock()
-    item.model_dump.return_value = {"name": "foo"}
+    item = StubItem({"name": "foo"})
     monkeypatch.setattr("app.v1.crud.split_camel_case", lambda x: "Dummy Entity")
     error = Exception("UNIQUE constraint failed: dummyentity.name")
     error.args = ("UNIQUE constraint failed: dummyentity.name",)
@@ -245,20 +463,92 @@ def test_raise_from_integrity_error_unique(session, monkeypatch):
     session.rollback.assert_called_once()
 
 
+def test_raise_from_integrity_error_unique_composite(session, monkeypatch):
+    """Test raise_from_integrity_error reports all the columns of a composite key."""
+    item = StubItem({"sub": "foo", "issuer": "bar"})
+    monkeypatch.setattr("app.v1.crud.split_camel_case", lambda x: "User")
+    error = Exception("UNIQUE constraint failed: user.sub, user.issuer")
+    with pytest.raises(ConflictError) as exc:
+        raise_from_integrity_error(entity=User, session=session, item=item, error=error)
+    assert "User with sub 'foo' and issuer 'bar' already exists" in str(exc.value)
+    with pytest.raises(ConflictError) as exc:
+        raise_from_integrity_error(entity=User, session=session, item=None, error=error)
+    assert "User with the given sub and issuer already exists" in str(exc.value)
+
+
+def test_raise_from_integrity_error_unique_constraint_name(session, monkeypatch):
+    """Test raise_from_integrity_error uses the constraint name given by the driver."""
+    item = StubItem({"sub": "foo", "issuer": "bar"})
+    monkeypatch.setattr("app.v1.crud.split_camel_case", lambda x: "User")
+    orig = Exception('duplicate key value violates unique constraint "..."')
+    orig.diag = MagicMock(constraint_name="unique_sub_issuer_couple")
+    error = sqlalchemy.exc.IntegrityError(statement=None, params=None, orig=orig)
+    with pytest.raises(ConflictError) as exc:
+        raise_from_integrity_error(entity=User, session=session, item=item, error=error)
+    assert "User with sub 'foo' and issuer 'bar' already exists" in str(exc.value)
+
+
+@pytest.mark.parametrize(
+    "constraint_name,expected",
+    [("user_pkey", ["id"]), ("unique_sub_issuer_couple", ["sub", "issuer"])],
+)
+def test_parse_integrity_error_default_constraint_name(constraint_name, expected):
+    """Test unnamed constraints match the PostgreSQL default names of the driver."""
+    orig = Exception(
+        f'duplicate key value violates unique constraint "{constraint_name}"'
+    )
+    orig.diag = MagicMock(sqlstate="23505", constraint_name=constraint_name)
+    error = sqlalchemy.exc.IntegrityError(statement=None, params=None, orig=orig)
+    assert parse_integrity_error(entity=User, error=error) == ("UNIQUE", expected)
+
+
+def test_parse_integrity_error_not_null_sqlstate():
+    """Test NOT NULL violations are read from the driver diagnostics."""
+    orig = Exception('null value in column "name" violates not-null constraint')
+    orig.diag = MagicMock(sqlstate="23502", column_name="name")
+    error = sqlalchemy.exc.IntegrityError(statement=None, params=None, orig=orig)
+    assert parse_integrity_error(entity=User, error=error) == ("NOT NULL", ["name"])
+
+
+def test_parse_integrity_error_other_constraint_name():
+    """Test constraints other than UNIQUE ones named by the driver are not conflicts."""
+    orig = Exception('new row violates check constraint "non_negative_value"')
+    orig.diag = MagicMock(constraint_name="non_negative_value")
+    error = sqlalchemy.exc.IntegrityError(statement=None, params=None, orig=orig)
+    assert parse_integrity_error(entity=DummyEntity, error=error) is None
+
+
+@pytest.mark.parametrize(
+    "message,expected",
+    [
+        ("NOT NULL constraint failed: dummyentity.name", ("NOT NULL", ["name"])),
+        ("UNIQUE constraint failed: dummyentity.name", ("UNIQUE", ["name"])),
+        (
+            "UNIQUE constraint failed: user.sub, user.issuer",
+            ("UNIQUE", ["sub", "issuer"]),
+        ),
+        ("Some other error", None),
+    ],
+)
+def test_parse_integrity_error(message, expected):
+    """Test parse_integrity_error finds constraint kind and columns in one match."""
+    assert parse_integrity_error(entity=User, error=Exception(message)) == expected
+
+
 def test_raise_from_integrity_error_other_error(session, monkeypatch):
-    """Test raise_from_integrity_error raises a generic error."""
-    item = MagicMock()
-    item.model_dump.return_value = {"name": "foo"}
+    """Test raise_from_integrity_error re-raises errors it does not recognize."""
+    item = StubItem({"name": "foo"})
     monkeypatch.setattr("app.v1.crud.split_camel_case", lambda x: "Dummy Entity")
     error = Exception("Some other error")
     error.args = ("Some other error",)
-    # Should not raise NotNullError or ConflictError
-    raise_from_integrity_error(
-        entity=DummyEntity,
-        session=session,
-        item=item,
-        error=error,
-    )
+    with pytest.raises(Exception) as exc:
+        raise_from_integrity_error(
+            entity=DummyEntity,
+            session=session,
+            item=item,
+            error=error,
+        )
+    assert exc.value is error
     session.rollback.assert_called_once()
 
 
@@ -274,12 +564,32 @@ def test_update_item_success(session, item_id):
     update_item(entity=DummyEntity, session=session, item_id=item_id, new_data=new_data)
     session.exec.assert_called()
     session.commit.assert_called_once()
+    statement = session.exec.call_args[0][0]
+    assert statement.get_execution_options()["synchronize_session"] is False
+    new_data.model_dump.assert_called_once_with(exclude_unset=True)
+
+
+def test_update_item_sets_updated_at(session, item_id):
+    """Test update_item sets updated_at with the DB now() function when editing."""
+    new_data = StubItem({"name": "newname"})
+    session.exec.return_value.rowcount = 1
+    editor = MagicMock(id=uuid.uuid4())
+
+    update_item(
+        entity=DummyEntity,
+        session=session,
+        item_id=item_id,
+        new_data=new_data,
+        updated_by=editor,
+    )
+    statement = session.exec.call_args[0][0]
+    values = {getattr(k, "key", k): v for k, v in statement._values.items()}
+    assert str(values["updated_at"]) == "now()"
 
 
 def test_update_item_no_item_to_update(session, item_id):
     """Test update_item raises NoItemToUpdateError when rowcount == 0."""
-    new_data = MagicMock()
-    new_data.model_dump.return_value = {"name": "newname"}
+    new_data = StubItem({"name": "newname"})
     exec_result = MagicMock()
     exec_result.rowcount = 0
     session.exec.return_value = exec_result
@@ -293,46 +603,17 @@ def test_update_item_no_item_to_update(session, item_id):
     session.commit.assert_not_called()
 
 
-def test_update_item_integrity_error_not_null(monkeypatch, session, item_id):
-    """Test update_item raises NotNullError on NOT NULL constraint violation."""
-    new_data = MagicMock()
-    new_data.model_dump.return_value = {"name": None}
-    # Simulate IntegrityError for NOT NULL constraint
-    exc = sqlalchemy.exc.IntegrityError(
-        statement=None,
-        params=None,
-        orig=Exception("NOT NULL constraint failed: dummyentity.name"),
-    )
-    exc.args = ("NOT NULL constraint failed: dummyentity.name",)
-    session.exec.side_effect = exc
-    monkeypatch.setattr("app.v1.crud.split_camel_case", lambda x: "Dummy Entity")
-
-    with pytest.raises(NotNullError) as e:
-        update_item(
-            entity=DummyEntity, session=session, item_id=item_id, new_data=new_data
-        )
-    assert "can't be NULL" in str(e.value)
-    session.rollback.assert_called_once()
-    session.commit.assert_not_called()
-
-
-def test_update_item_integrity_error_unique(monkeypatch, session, item_id):
-    """Test update_item raises ConflictError on UNIQUE constraint violation."""
-    new_data = MagicMock()
-    new_data.model_dump.return_value = {"name": "foo"}
-    exc = sqlalchemy.exc.IntegrityError(
-        statement=None,
-        params=None,
-        orig=Exception("UNIQUE constraint failed: dummyentity.name"),
-    )
-    exc.args = ("UNIQUE constraint failed: dummyentity.name",)
-    session.exec.side_effect = exc
+@pytest.mark.parametrize("msg,exc,substr", INTEGRITY_CASES)
+def test_update_item_integrity(msg, exc, substr, monkeypatch, session, item_id):
+    """Test update_item maps constraint violations to the matching API error."""
+    new_data = StubItem({"name": "foo"})
+    session.exec.side_effect = _integrity_error(msg)
     monkeypatch.setattr("app.v1.crud.split_camel_case", lambda x: "Dummy Entity")
 
-    with pytest.raises(ConflictError) as e:
+    with pytest.raises(exc) as e:
         update_item(
             entity=DummyEntity, session=session, item_id=item_id, new_data=new_data
         )
-    assert "already exists" in str(e.value)
+    assert substr in str(e.value)
     session.rollback.assert_called_once()
     session.commit.assert_not_called()
@@ -4,38 +4,46 @@ These tests cover:
 - Table creation and logging in create_db_and_tables
 - Engine disposal and logging in dispose_engine
 - Session yielding in get_session
+- Engine options depending on the DB backend in get_engine_options
 """
 
-from sqlmodel import Session, SQLModel
+from collections import deque
 
-from app.db import create_db_and_tables, dispose_engine, engine, get_session
+import sqlalchemy
+from sqlmodel import Session
+
+import app.db
+from app.config import Settings
+from app.db import (
+    DB_POOL_RECYCLE,
+    create_db_and_tables,
+    dispose_engine,
+    get_engine_options,
+    get_session,
+)
+
+LOGGED_MESSAGES = 64
 
 
 class DummyLogger:
     """Dummy logger to capture log messages for assertions in tests."""
 
     def __init__(self):
-        """Initialize the DummyLogger with an empty messages list."""
-        self.messages = []
+        """Initialize the DummyLogger with a bounded messages buffer."""
+        self.messages = deque(maxlen=LOGGED_MESSAGES)
 
     def info(self, msg, *args):
         """Capture info log messages for assertions in tests."""
-        self.messages.append((msg, args))
+        self.messages.append(msg)
 
 
-def test_create_db_and_tables_creates_tables(monkeypatch):
-    """Test that `create_db_and_tables` calls SQLModel.metadata.create_all."""
+def test_create_db_and_tables_creates_tables(db_engine):
+    """Test that `create_db_and_tables` creates the tables on the app engine."""
     logger = DummyLogger()
-    called = {}
-
-    def fake_create_all(bind):
-        called["bind"] = bind
-
-    monkeypatch.setattr(SQLModel.metadata, "create_all", fake_create_all)
     result = create_db_and_tables(logger)
-    assert called["bind"] is engine
-    assert result is engine
-    assert any("Connecting to database" in msg for msg, _ in logger.messages)
+    assert result is db_engine
+    assert "user" in sqlalchemy.inspect(db_engine).get_table_names()
+    assert any("Connecting to database" in msg for msg in logger.messages)
 
 
 def test_dispose_engine_calls_engine_dispose(monkeypatch):
@@ -46,19 +54,43 @@ def test_dispose_engine_calls_engine_dispose(monkeypatch):
     def fake_dispose():
         called["dispose"] = True
 
-    monkeypatch.setattr(engine, "dispose", fake_dispose)
+    monkeypatch.setattr(app.db.engine, "dispose", fake_dispose)
     dispose_engine(logger)
     assert called["dispose"]
-    assert any("Disconnecting from database" in msg for msg, _ in logger.messages)
+    assert any("Disconnecting from database" in msg for msg in logger.messages)
 
 
-def test_get_session_yields_session():
+def test_get_session_yields_session(db_engine):
     """Test that get_session yields a Session instance bound to the engine."""
     gen = get_session()
     session = next(gen)
     assert isinstance(session, Session)
+    assert session.get_bind() is db_engine
     # Clean up generator
     try:
         next(gen)
     except StopIteration:
         pass
+
+
+def test_get_engine_options_sqlite():
+    """Test that SQLite engines only disable the same thread check."""
+    settings = Settings(DB_URL="sqlite+pysqlite:///:memory:")
+    assert get_engine_options(settings) == {
+        "connect_args": {"check_same_thread": False}
+    }
+
+
+def test_get_engine_options_pool():
+    """Test that non SQLite engines use the configured connection pool."""
+    settings = Settings(
+        DB_URL="postgresql+psycopg2://user:pwd@db/app",
+        DB_POOL_SIZE=10,
+        DB_MAX_OVERFLOW=5,
+    )
+    assert get_engine_options(settings) == {
+        "pool_size": 10,
+        "max_overflow": 5,
+        "pool_pre_ping": True,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
@@ -2,7 +2,9 @@
 
 from unittest import mock
 
+import httpx
 import pytest
+from cachetools import TTLCache
 
 from app import main
 
@@ -12,7 +14,8 @@ async def test_lifespan_calls_dependencies(mock_logger):
     """Test that `lifespan` correctly calls its dependencies.
 
     This test verifies:
-    - The logger is obtained and returned in the context.
+    - The logger, the OPA client and the OPA cache are obtained and returned in the
+        context.
     - The `configure_flaat` and `create_db_and_tables` functions are called with the
         expected arguments.
     - The `dispose_engine` function is not called until the context is exited.
@@ -36,7 +39,12 @@ async def test_lifespan_calls_dependencies(mock_logger):
         cm = main.lifespan(dummy_app)
         # __aenter__ yields the dict
         result = await cm.__aenter__()
-        assert result == {"logger": mock_logger}
+        assert result["logger"] is mock_logger
+        opa_client = result["opa_client"]
+        assert isinstance(opa_client, httpx.AsyncClient)
+        assert not opa_client.is_closed
+        assert isinstance(result["opa_cache"], TTLCache)
+        assert result["opa_cache"].ttl == main.settings.OPA_CACHE_TTL
 
         # Check that dependencies were called as expected
         mock_get_logger.assert_called_once_with(main.settings)
@@ -47,3 +55,4 @@ async def test_lifespan_calls_dependencies(mock_logger):
         # Now exit the context and check dispose_engine is called
         await cm.__aexit__(None, None, None)
         mock_dispose_engine.assert_called_once_with(mock_logger)
+        assert opa_client.is_closed
@@ -4,13 +4,31 @@ These tests cover:
 - Logger creation and configuration in get_logger
 - Log level setting
 - Log message formatting
+- Log records offloaded to a background queue listener
+- Handlers not duplicated on repeated calls
 """
 
 import logging
 import re
+from logging.handlers import QueueHandler
+
+import pytest
 
 from app.logger import get_logger
 
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+@pytest.fixture(autouse=True)
+def restore_logger():
+    """Restore the app logger handlers and level changed by the test."""
+    logger = logging.getLogger("app-api")
+    handlers = list(logger.handlers)
+    level = logger.level
+    yield
+    logger.handlers[:] = handlers
+    logger.setLevel(level)
+
 
 class DummySettings:
     """Dummy settings class for testing logger configuration."""
@@ -33,8 +51,14 @@ def test_get_logger_adds_stream_handler_and_formatter(monkeypatch):
     """Test that get_logger adds a StreamHandler with the correct formatter."""
     settings = DummySettings(logging.INFO)
     logger = get_logger(settings)
-    # There should be at least one StreamHandler
-    handlers = [h for h in logger.handlers if isinstance(h, logging.StreamHandler)]
+    # The StreamHandler is attached to the listener of the logger's QueueHandler
+    queue_handlers = [h for h in logger.handlers if isinstance(h, QueueHandler)]
+    assert queue_handlers, "No QueueHandler attached to logger"
+    handlers = [
+        h
+        for h in queue_handlers[0].listener.handlers
+        if isinstance(h, logging.StreamHandler)
+    ]
     assert handlers, "No StreamHandler attached to logger"
     # The formatter should match the expected format
     formatter = handlers[0].formatter
@@ -49,9 +73,19 @@ def test_get_logger_adds_stream_handler_and_formatter(monkeypatch):
     )
     formatted = formatter.format(log_record)
     # Check for expected fields in the formatted log
-    assert re.search(r"\d{4}-\d{2}-\d{2}", formatted)  # Date
+    assert _DATE_RE.search(formatted)  # Date
     assert "INFO" in formatted
     assert "fed-mgr-api" in formatted
     assert "Test message" in formatted
     assert "processName" in formatter._fmt
     assert "threadName" in formatter._fmt
+
+
+def test_get_logger_does_not_duplicate_handlers():
+    """Test that repeated get_logger calls attach a single running queue handler."""
+    logger = get_logger(DummySettings(logging.INFO))
+    logger = get_logger(DummySettings(logging.DEBUG))
+    queue_handlers = [h for h in logger.handlers if isinstance(h, QueueHandler)]
+    assert len(queue_handlers) == 1
+    assert queue_handlers[0].listener._thread is not None
+    assert logger.level == logging.DEBUG
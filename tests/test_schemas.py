@@ -8,15 +8,16 @@ Covers:
 - test_pagination_total_pages
 - test_page_navigation_fields
 - test_paginated_list_page_and_links_properties
+- test_paginated_list_links_keep_query_params
 - test_creation_time_field_assignment
-- test_creation_time_default_value_is_func_now
+- test_creation_time_server_default_is_func_now
 - test_creation_time_query_fields
 - test_creator_fields
 - test_creator_query_fields
 - test_creation_inheritance
 - test_creation_query_inheritance
 - test_update_time_field_assignment
-- test_update_time_default_value_is_func_now
+- test_update_time_server_default_is_func_now
 - test_update_time_query_fields
 - test_editor_fields
 - test_editor_query_fields
@@ -28,7 +29,9 @@ Covers:
 import uuid
 from datetime import datetime
 
+import pytest
 from pydantic import AnyHttpUrl
+from sqlmodel import func
 
 from app.v1.schemas import (
     Creation,
@@ -52,6 +55,11 @@ from app.v1.schemas import (
     UpdateTime,
 )
 
+_NOW = datetime(2025, 1, 1, 12, 0, 0)
+_TEST_UUID = uuid.UUID(int=1)
+RESOURCE_URL = AnyHttpUrl("http://test/resource")
+PAGE_URLS = {i: f"http://test/resource?page={i}" for i in (1, 2, 3)}
+
 
 def test_item_id_default():
     """Generate ItemID with a valid UUID by default."""
@@ -78,14 +86,11 @@ def test_pagination_query_defaults():
     assert pq.page == 1
 
 
-def test_pagination_total_pages():
+@pytest.mark.parametrize("total,expected", [(0, 1), (12, 3), (5, 1)])
+def test_pagination_total_pages(total, expected):
     """Compute total_pages in Pagination for various cases."""
-    p = Pagination(size=5, number=1, total_elements=0)
-    assert p.total_pages == 1
-    p = Pagination(size=5, number=1, total_elements=12)
-    assert p.total_pages == 3
-    p = Pagination(size=5, number=1, total_elements=5)
-    assert p.total_pages == 1
+    p = Pagination(size=5, number=1, total_elements=total)
+    assert p.total_pages == expected
 
 
 def test_page_navigation_fields():
@@ -102,7 +107,6 @@ def test_page_navigation_fields():
 def test_paginated_list_page_and_links_properties():
     """Test PaginatedList computed properties: page and links."""
     # Prepare test data
-    url = AnyHttpUrl("http://test/resource")
     page_number = 2
     page_size = 5
     tot_items = 12
@@ -111,7 +115,7 @@ def test_paginated_list_page_and_links_properties():
         page_number=page_number,
         page_size=page_size,
         tot_items=tot_items,
-        resource_url=url,
+        resource_url=RESOURCE_URL,
     )
 
     # Test page property
@@ -124,55 +128,69 @@ def test_paginated_list_page_and_links_properties():
     # Test links property
     links = paginated.links
     assert isinstance(links, PageNavigation)
-    assert links.first == AnyHttpUrl("http://test/resource?page=1")
-    assert links.last == AnyHttpUrl("http://test/resource?page=3")
-    assert links.prev == AnyHttpUrl("http://test/resource?page=1")
-    assert links.next == AnyHttpUrl("http://test/resource?page=3")
+    assert str(links.first) == PAGE_URLS[1]
+    assert str(links.last) == PAGE_URLS[3]
+    assert str(links.prev) == PAGE_URLS[1]
+    assert str(links.next) == PAGE_URLS[3]
 
     # Test edge cases: first page (no prev)
     paginated_first = PaginatedList(
         page_number=1,
         page_size=page_size,
         tot_items=tot_items,
-        resource_url=url,
+        resource_url=RESOURCE_URL,
     )
     links_first = paginated_first.links
     assert links_first.prev is None
-    assert links_first.next == AnyHttpUrl("http://test/resource?page=2")
+    assert str(links_first.next) == PAGE_URLS[2]
 
     # Test edge cases: last page (no next)
     paginated_last = PaginatedList(
         page_number=3,
         page_size=page_size,
         tot_items=tot_items,
-        resource_url=url,
+        resource_url=RESOURCE_URL,
     )
     links_last = paginated_last.links
     assert links_last.next is None
-    assert links_last.prev == AnyHttpUrl("http://test/resource?page=2")
+    assert str(links_last.prev) == PAGE_URLS[2]
+
+
+def test_paginated_list_links_keep_query_params():
+    """Test PaginatedList links keep the other query params and are cached."""
+    paginated = PaginatedList(
+        page_number=2,
+        page_size=2,
+        tot_items=6,
+        resource_url=AnyHttpUrl("http://test/resource?size=2&page=2&name=foo"),
+    )
+    links = paginated.links
+    assert str(links.first) == "http://test/resource?size=2&name=foo&page=1"
+    assert str(links.prev) == "http://test/resource?size=2&name=foo&page=1"
+    assert str(links.next) == "http://test/resource?size=2&name=foo&page=3"
+    assert str(links.last) == "http://test/resource?size=2&name=foo&page=3"
+    assert paginated.links is links
+    assert paginated.page is paginated.page
+    assert paginated.model_dump()["links"]["next"] == links.next
 
 
 def test_creation_time_field_assignment():
     """Test CreationTime schema field assignment."""
-    now = datetime.now()
+    now = _NOW
     ct = CreationTime(created_at=now)
     assert ct.created_at == now
 
 
-def test_creation_time_default_value_is_func_now():
-    """Test CreationTime default value is set to func.now()."""
-    # The default is a SQLModel/SQLAlchemy function, so we check the default_factory
+def test_creation_time_server_default_is_func_now():
+    """Test CreationTime delegates the default value to the DB with func.now()."""
     field = CreationTime.model_fields["created_at"]
-    assert (
-        field.default == field.default
-        or field.default_factory
-        or field.default_factory is not None
-    )
+    assert field.is_required()
+    assert str(field.sa_column_kwargs["server_default"]) == str(func.now())
 
 
 def test_creation_time_query_fields():
     """Set created_before and created_after in CreationQuery."""
-    now = datetime.now()
+    now = _NOW
     cq = CreationQuery(created_before=now, created_after=now)
     assert cq.created_before == now
     assert cq.created_after == now
@@ -180,7 +198,7 @@ def test_creation_time_query_fields():
 
 def test_creator_fields():
     """Test Creator schema field assignment."""
-    user_id = uuid.uuid4()
+    user_id = _TEST_UUID
     creator = Creator(created_by=user_id)
     assert creator.created_by == user_id
 
@@ -195,8 +213,8 @@ def test_creator_query_fields():
 
 def test_creation_inheritance():
     """Test Creation schema inherits from Creator and CreationTime."""
-    user_id = uuid.uuid4()
-    now = datetime.now()
+    user_id = _TEST_UUID
+    now = _NOW
     creation = Creation(created_by=user_id, created_at=now)
     assert creation.created_by == user_id
     assert creation.created_at == now
@@ -204,7 +222,7 @@ def test_creation_inheritance():
 
 def test_creation_query_inheritance():
     """Test CreationQuery schema inherits from CreatorQuery and CreationTimeQuery."""
-    now = datetime.now()
+    now = _NOW
     cq = CreationQuery(created_before=now, created_after=now, created_by="abc")
     assert cq.created_before == now
     assert cq.created_after == now
@@ -213,24 +231,21 @@ def test_creation_query_inheritance():
 
 def test_update_time_field_assignment():
     """Test UpdateTime schema field assignment."""
-    now = datetime.now()
+    now = _NOW
     ut = UpdateTime(updated_at=now)
     assert ut.updated_at == now
 
 
-def test_update_time_default_value_is_func_now():
-    """Test UpdateTime default value is set to func.now()."""
+def test_update_time_server_default_is_func_now():
+    """Test UpdateTime delegates the default value to the DB with func.now()."""
     field = UpdateTime.model_fields["updated_at"]
-    assert (
-        field.default == field.default
-        or field.default_factory
-        or field.default_factory is not None
-    )
+    assert field.is_required()
+    assert str(field.sa_column_kwargs["server_default"]) == str(func.now())
 
 
 def test_update_time_query_fields():
     """Set updated_before and updated_after in UpdateQuery."""
-    now = datetime.now()
+    now = _NOW
     uq = UpdateQuery(updated_before=now, updated_after=now)
     assert uq.updated_before == now
     assert uq.updated_after == now
@@ -238,7 +253,7 @@ def test_update_time_query_fields():
 
 def test_editor_fields():
     """Test Editor schema field assignment."""
-    user_id = uuid.uuid4()
+    user_id = _TEST_UUID
     editor = Editor(updated_by=user_id)
     assert editor.updated_by == user_id
 
@@ -253,8 +268,8 @@ def test_editor_query_fields():
 
 def test_editable_inheritance():
     """Test Editable schema inherits from Editor and UpdateTime."""
-    user_id = uuid.uuid4()
-    now = datetime.now()
+    user_id = _TEST_UUID
+    now = _NOW
     editable = Editable(updated_by=user_id, updated_at=now)
     assert editable.updated_by == user_id
     assert editable.updated_at == now
@@ -262,7 +277,7 @@ def test_editable_inheritance():
 
 def test_editable_query_inheritance():
     """Test EditableQuery schema inherits from EditorQuery and UpdateQuery."""
-    now = datetime.now()
+    now = _NOW
     eq = EditableQuery(updated_before=now, updated_after=now, updated_by="xyz")
     assert eq.updated_before == now
     assert eq.updated_after == now
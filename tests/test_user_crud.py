@@ -9,7 +9,8 @@ This module contains tests for the following functionalities:
 
 Fixtures:
     session: Provides a mock database session for testing.
-    user_id: Generates a unique UUID for user identification in tests.
+    crud_mocks: Replaces the common crud functions used by the user crud module.
+    user_id: Generates a UUID for user identification shared by the tests.
 
 Test Cases:
     test_get_user_found: Verifies that `get_user` returns the expected user object
@@ -30,27 +31,72 @@ Test Cases:
         object when the user is found.
     test_get_current_user_not_found: Verifies that `get_current_user` returns None
         when the user is not found.
+    test_get_current_user_cached: Verifies that `get_current_user` retrieves cached
+        users by primary key.
+    test_get_current_user_cache_invalidation: Verifies that updating or deleting a
+        user removes it from the current users cache and from its reverse mapping.
 """
 
 import uuid
+from types import SimpleNamespace
 from unittest import mock
 
 import pytest
 
+import app.v1.users.crud as users_crud
 from app.v1.users.crud import (
     add_user,
+    current_user_ids,
+    current_user_keys,
     delete_user,
     get_current_user,
     get_user,
     get_users,
     update_user,
 )
-from app.v1.users.schemas import User, UserCreate
+from app.v1.users.schemas import User
 
+CURRENT_USER_QUERY = {
+    "skip": 0,
+    "limit": 1,
+    "sort": "-created_at",
+    "sub": "sub-123",
+    "issuer": "issuer-abc",
+}
 
-@pytest.fixture
+
+@pytest.fixture(autouse=True)
+def clear_current_user_ids():
+    """Empty the current users cache before and after each test."""
+    current_user_ids.clear()
+    current_user_keys.clear()
+    yield
+    current_user_ids.clear()
+    current_user_keys.clear()
+
+
+@pytest.fixture(autouse=True)
+def crud_mocks(monkeypatch):
+    """Replace the common crud functions used by the user crud module with mocks.
+
+    Returns:
+        types.SimpleNamespace: The mocks, accessible by function name.
+
+    """
+    mocks = {
+        name: mock.Mock()
+        for name in ("get_item", "get_items", "add_item", "update_item", "delete_item")
+    }
+    for name, value in mocks.items():
+        monkeypatch.setattr(users_crud, name, value)
+    return SimpleNamespace(**mocks)
+
+
+@pytest.fixture(scope="module")
 def user_id():
-    """Generate and return a new unique user ID using UUID version 4.
+    """Generate and return a user ID, using UUID version 4, shared by the module.
+
+    UUIDs are immutable and the tests never store users, so they can share one.
 
     Returns:
         uuid.UUID: A randomly generated UUID object representing a unique user ID.
@@ -59,12 +105,13 @@ def user_id():
     return uuid.uuid4()
 
 
-def test_get_user_found(session, user_id):
+def test_get_user_found(session, user_id, crud_mocks):
     """Test that the `get_user` returns the expected user object when the user is found.
 
     Args:
         session: The database session used for querying.
         user_id: The ID of the user to retrieve.
+        crud_mocks: The mocked common crud functions.
 
     Behavior:
         - Mocks the `get_item` function to return a fake user object.
@@ -72,18 +119,16 @@ def test_get_user_found(session, user_id):
         - Asserts that the result of `get_user` is the mocked user object.
 
     """
-    fake_user = mock.Mock(spec=User)
-    with mock.patch(
-        "app.v1.users.crud.get_item", return_value=fake_user
-    ) as mock_get_item:
-        result = get_user(user_id, session)
-        mock_get_item.assert_called_once_with(
-            session=session, entity=User, item_id=user_id
-        )
-        assert result is fake_user
+    fake_user = mock.sentinel.user
+    crud_mocks.get_item.return_value = fake_user
+    result = get_user(user_id, session)
+    crud_mocks.get_item.assert_called_once_with(
+        session=session, entity=User, item_id=user_id
+    )
+    assert result is fake_user
 
 
-def test_get_user_not_found(session, user_id):
+def test_get_user_not_found(session, user_id, crud_mocks):
     """Test that `get_user` returns None when the user with the given id is not found.
 
     This test mocks the `get_item` function to return None, simulating the case where
@@ -93,17 +138,18 @@ def test_get_user_not_found(session, user_id):
     Args:
         session: The database session used for the query.
         user_id: The ID of the user to retrieve.
+        crud_mocks: The mocked common crud functions.
 
     """
-    with mock.patch("app.v1.users.crud.get_item", return_value=None) as mock_get_item:
-        result = get_user(user_id, session)
-        mock_get_item.assert_called_once_with(
-            session=session, entity=User, item_id=user_id
-        )
-        assert result is None
+    crud_mocks.get_item.return_value = None
+    result = get_user(user_id, session)
+    crud_mocks.get_item.assert_called_once_with(
+        session=session, entity=User, item_id=user_id
+    )
+    assert result is None
 
 
-def test_get_users_returns_users_and_count(session):
+def test_get_users_returns_users_and_count(session, crud_mocks):
     """Verify that `get_users` returns a tuple with a list of user and total count.
 
     This test mocks the `get_items` function to return a fake list of users and a
@@ -112,21 +158,20 @@ def test_get_users_returns_users_and_count(session):
 
     Args:
         session: The mock database session used for the query.
+        crud_mocks: The mocked common crud functions.
 
     """
-    fake_users = [mock.Mock(spec=User), mock.Mock(spec=User)]
+    fake_users = [mock.sentinel.user, mock.sentinel.other_user]
     fake_count = 2
-    with mock.patch(
-        "app.v1.users.crud.get_items", return_value=(fake_users, fake_count)
-    ) as mock_get_items:
-        result = get_users(session=session, skip=0, limit=10, sort="id")
-        mock_get_items.assert_called_once_with(
-            session=session, entity=User, skip=0, limit=10, sort="id"
-        )
-        assert result == (fake_users, fake_count)
+    crud_mocks.get_items.return_value = (fake_users, fake_count)
+    result = get_users(session=session, skip=0, limit=10, sort="id")
+    crud_mocks.get_items.assert_called_once_with(
+        session=session, entity=User, skip=0, limit=10, sort="id"
+    )
+    assert result == (fake_users, fake_count)
 
 
-def test_get_users_returns_empty_list_and_zero_count(session):
+def test_get_users_returns_empty_list_and_zero_count(session, crud_mocks):
     """Verify that `get_users` returns an empty list and zero count when no users.
 
     This test mocks the `get_items` function to return an empty list and zero count,
@@ -135,21 +180,20 @@ def test_get_users_returns_empty_list_and_zero_count(session):
 
     Args:
         session: The mock database session used for the query.
+        crud_mocks: The mocked common crud functions.
 
     """
     fake_users = []
     fake_count = 0
-    with mock.patch(
-        "app.v1.users.crud.get_items", return_value=(fake_users, fake_count)
-    ) as mock_get_items:
-        result = get_users(session=session, skip=0, limit=10, sort="id")
-        mock_get_items.assert_called_once_with(
-            session=session, entity=User, skip=0, limit=10, sort="id"
-        )
-        assert result == (fake_users, fake_count)
+    crud_mocks.get_items.return_value = (fake_users, fake_count)
+    result = get_users(session=session, skip=0, limit=10, sort="id")
+    crud_mocks.get_items.assert_called_once_with(
+        session=session, entity=User, skip=0, limit=10, sort="id"
+    )
+    assert result == (fake_users, fake_count)
 
 
-def test_add_user_success(session):
+def test_add_user_success(session, crud_mocks):
     """Verify that `add_user` calls `add_item`.
 
     This test mocks the `add_item` function to return a fake user object, then
@@ -158,21 +202,20 @@ def test_add_user_success(session):
 
     Args:
         session: The mock database session used for the operation.
+        crud_mocks: The mocked common crud functions.
 
     """
-    fake_user_create = mock.Mock(spec=UserCreate)
-    fake_item_id = mock.Mock()
-    with mock.patch(
-        "app.v1.users.crud.add_item", return_value=fake_item_id
-    ) as mock_add_item:
-        result = add_user(session=session, user=fake_user_create)
-        mock_add_item.assert_called_once_with(
-            session=session, entity=User, item=fake_user_create
-        )
-        assert result is fake_item_id
-
-
-def test_delete_user_calls_delete_item(session, user_id):
+    fake_user_create = mock.sentinel.user_create
+    fake_item_id = mock.sentinel.user
+    crud_mocks.add_item.return_value = fake_item_id
+    result = add_user(session=session, user=fake_user_create)
+    crud_mocks.add_item.assert_called_once_with(
+        session=session, entity=User, item=fake_user_create
+    )
+    assert result is fake_item_id
+
+
+def test_delete_user_calls_delete_item(session, user_id, crud_mocks):
     """Verify that `delete_user` calls `delete_item` with the correct arguments.
 
     This test mocks the `delete_item` function and asserts that it is called once
@@ -182,71 +225,105 @@ def test_delete_user_calls_delete_item(session, user_id):
     Args:
         session: The mock database session used for the operation.
         user_id: The ID of the user to delete.
+        crud_mocks: The mocked common crud functions.
 
     """
-    with mock.patch("app.v1.users.crud.delete_item") as mock_delete_item:
-        delete_user(session=session, user_id=user_id)
-        mock_delete_item.assert_called_once_with(
-            session=session, entity=User, item_id=user_id
-        )
+    delete_user(session=session, user_id=user_id)
+    crud_mocks.delete_item.assert_called_once_with(
+        session=session, entity=User, item_id=user_id
+    )
 
 
-def test_get_current_user_found(session):
+def test_get_current_user_found(session, monkeypatch):
     """Test get_current_user returns the user when found."""
     user_infos = mock.Mock()
     user_infos.user_info = {"sub": "sub-123", "iss": "issuer-abc"}
     fake_user = mock.Mock(spec=User)
-    with mock.patch(
-        "app.v1.users.crud.get_users", return_value=([fake_user], 1)
-    ) as mock_get_users:
-        result = get_current_user(user_infos, session)
-        mock_get_users.assert_called_once_with(
-            session=session,
-            skip=0,
-            limit=1,
-            sort="-created_at",
-            sub=user_infos.user_info["sub"],
-            issuer=user_infos.user_info["iss"],
-        )
-        assert result is fake_user
-
-
-def test_get_current_user_not_found(session):
+    mock_get_users = mock.Mock(return_value=([fake_user], 1))
+    monkeypatch.setattr(users_crud, "get_users", mock_get_users)
+    result = get_current_user(user_infos, session)
+    assert mock_get_users.call_count == 1
+    assert mock_get_users.call_args.args == ()
+    assert mock_get_users.call_args.kwargs == {
+        "session": session,
+        **CURRENT_USER_QUERY,
+    }
+    assert result is fake_user
+
+
+def test_get_current_user_not_found(session, monkeypatch):
     """Test get_current_user returns None when user is not found."""
     user_infos = mock.Mock()
     user_infos.user_info = {"sub": "sub-123", "iss": "issuer-abc"}
-    with mock.patch(
-        "app.v1.users.crud.get_users", return_value=([], 0)
-    ) as mock_get_users:
-        result = get_current_user(user_infos, session)
-        mock_get_users.assert_called_once_with(
-            session=session,
-            skip=0,
-            limit=1,
-            sort="-created_at",
-            sub=user_infos.user_info["sub"],
-            issuer=user_infos.user_info["iss"],
-        )
-        assert result is None
-
-
-def test_update_user_success(session, user_id):
+    mock_get_users = mock.Mock(return_value=([], 0))
+    monkeypatch.setattr(users_crud, "get_users", mock_get_users)
+    result = get_current_user(user_infos, session)
+    assert mock_get_users.call_count == 1
+    assert mock_get_users.call_args.args == ()
+    assert mock_get_users.call_args.kwargs == {
+        "session": session,
+        **CURRENT_USER_QUERY,
+    }
+    assert result is None
+
+
+def test_get_current_user_cached(session, monkeypatch):
+    """Test get_current_user retrieves cached users by primary key."""
+    user_infos = mock.Mock()
+    user_infos.user_info = {"sub": "sub-123", "iss": "issuer-abc"}
+    fake_user = mock.Mock(spec=User)
+    fake_user.id = uuid.uuid4()
+    session.get.return_value = fake_user
+    mock_get_users = mock.Mock(return_value=([fake_user], 1))
+    monkeypatch.setattr(users_crud, "get_users", mock_get_users)
+    assert get_current_user(user_infos, session) is fake_user
+    assert get_current_user(user_infos, session) is fake_user
+    mock_get_users.assert_called_once()
+    session.get.assert_called_once_with(User, fake_user.id)
+    assert current_user_keys[fake_user.id] == ("sub-123", "issuer-abc")
+
+    # A cached user no longer in the DB is searched again
+    session.get.return_value = None
+    mock_get_users.reset_mock(return_value=True)
+    mock_get_users.return_value = ([], 0)
+    assert get_current_user(user_infos, session) is None
+    mock_get_users.assert_called_once()
+
+
+def test_get_current_user_cache_invalidation(session):
+    """Test updating or deleting a user removes it from the current users cache."""
+    user_id = uuid.uuid4()
+    other_id = uuid.uuid4()
+    current_user_ids[("sub-123", "issuer-abc")] = user_id
+    current_user_keys[user_id] = ("sub-123", "issuer-abc")
+    update_user(session=session, user_id=user_id, new_user=mock.Mock())
+    assert len(current_user_ids) == 0
+    assert len(current_user_keys) == 0
+    current_user_ids[("sub-123", "issuer-abc")] = user_id
+    current_user_keys[user_id] = ("sub-123", "issuer-abc")
+    current_user_ids[("other", "issuer-abc")] = other_id
+    current_user_keys[other_id] = ("other", "issuer-abc")
+    delete_user(session=session, user_id=user_id)
+    assert list(current_user_ids) == [("other", "issuer-abc")]
+    assert list(current_user_keys) == [other_id]
+    # Users not in the cache are ignored
+    delete_user(session=session, user_id=uuid.uuid4())
+    assert len(current_user_ids) == 1
+
+
+def test_update_user_success(session, user_id, crud_mocks):
     """Test that update_user calls update_item with correct arguments."""
-    fake_user_create = mock.Mock(spec=UserCreate)
-    with mock.patch("app.v1.users.crud.update_item") as mock_update_item:
-        update_user(session=session, user_id=user_id, new_user=fake_user_create)
-        mock_update_item.assert_called_once_with(
-            session=session, entity=User, item_id=user_id, new_data=fake_user_create
-        )
+    fake_user_create = mock.sentinel.user_create
+    update_user(session=session, user_id=user_id, new_user=fake_user_create)
+    crud_mocks.update_item.assert_called_once_with(
+        session=session, entity=User, item_id=user_id, new_data=fake_user_create
+    )
 
 
-def test_update_user_raises_no_item_to_update(session, user_id):
+def test_update_user_raises_no_item_to_update(session, user_id, crud_mocks):
     """Test that update_user propagates NoItemToUpdateError from update_item."""
-    fake_user_create = mock.Mock(spec=UserCreate)
-    with mock.patch(
-        "app.v1.users.crud.update_item",
-        side_effect=Exception("NoItemToUpdateError"),
-    ):
-        with pytest.raises(Exception) as exc_info:
-            update_user(session=session, user_id=user_id, new_user=fake_user_create)
-        assert "NoItemToUpdateError" in str(exc_info.value)
+    fake_user_create = mock.sentinel.user_create
+    crud_mocks.update_item.side_effect = Exception("NoItemToUpdateError")
+    with pytest.raises(Exception) as exc_info:
+        update_user(session=session, user_id=user_id, new_user=fake_user_create)
+    assert "NoItemToUpdateError" in str(exc_info.value)
@@ -1,116 +1,149 @@
 """Integration tests for app.v1.users.endpoints using FastAPI TestClient."""
 
-import uuid
+import json
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import MagicMock
 
 import pytest
 
-from app.auth import check_authentication
+from app.auth import check_authentication, check_authorization
 from app.exceptions import ConflictError, NoItemToUpdateError, NotNullError
 from app.main import sub_app_v1
 from app.v1.users.crud import get_user
+from app.v1.users.endpoints import user_router
+from app.v1.users.schemas import User, UserCreate
 
-
-@pytest.fixture(autouse=True)
-def patch_logger(monkeypatch, mock_logger):
-    """Patch the logger to use a mock logger during tests."""
-    monkeypatch.setattr("app.logger.get_logger", lambda *a, **kw: mock_logger)
+FAKE_USER_ID = "00000000-0000-4000-8000-000000000001"
+USER_DATA = MappingProxyType(
+    {
+        "sub": "testsub",
+        "name": "Test User",
+        "email": "test@example.com",
+        "issuer": "https://issuer.example.com",
+    }
+)
+# The request body is serialized once and sent as is.
+USER_DATA_JSON = json.dumps(dict(USER_DATA)).encode()
+JSON_HEADERS = {"Content-Type": "application/json"}
+FAKE_USER = SimpleNamespace(id=FAKE_USER_ID)
+FAKE_AUTH = SimpleNamespace(
+    subject="testsub",
+    issuer="https://issuer.example.com",
+    user_info={"name": "Test User", "email": "test@example.com"},
+)
+
+
+def _dependency_calls(dependant):
+    """Return the callables of all the (sub)dependencies of a dependant."""
+    calls = []
+    for dep in dependant.dependencies:
+        calls.append(dep.call)
+        calls.extend(_dependency_calls(dep))
+    return calls
+
+
+@pytest.mark.parametrize(
+    "route",
+    [r for r in user_router.routes if "OPTIONS" not in r.methods],
+    ids=lambda r: f"{next(iter(r.methods))} {r.path}",
+)
+def test_routes_share_auth_dependencies(route):
+    """Test routes depend on the module level auth callables.
+
+    FastAPI resolves a dependency once per request only if all the dependants use the
+    same callable.
+    """
+    calls = _dependency_calls(route.dependant)
+    assert check_authorization in calls
+    assert check_authentication in calls
+    assert not any(getattr(c, "__name__", None) == "<lambda>" for c in calls)
 
 
 def test_options_users(client):
     """Test OPTIONS /users/ returns 204 and Allow header."""
     resp = client.options("/api/v1/users/")
     assert resp.status_code == 204
-    assert "allow" in resp.headers or "Allow" in resp.headers
+    assert resp.headers["Allow"] == "DELETE, GET, OPTIONS, POST, PUT"
+    assert resp.content == b""
 
 
 def test_create_user_success(client, monkeypatch):
     """Test POST /users/ creates user and returns 201 with user id."""
-    user_data = {
-        "sub": "testsub",
-        "name": "Test User",
-        "email": "test@example.com",
-        "issuer": "https://issuer.example.com",
-    }
-    fake_id = str(uuid.uuid4())
-
-    class FakeUser:
-        id = fake_id
-
-    def fake_add_user(session, user):
-        return FakeUser()
-
-    monkeypatch.setattr("app.v1.users.endpoints.add_user", fake_add_user)
-    resp = client.post("/api/v1/users/", json=user_data)
+    monkeypatch.setattr(
+        "app.v1.users.endpoints.add_user", lambda session, user: FAKE_USER
+    )
+    resp = client.post("/api/v1/users/", content=USER_DATA_JSON, headers=JSON_HEADERS)
     assert resp.status_code == 201
-    assert resp.json() == {"id": fake_id}
+    assert resp.content == b'{"id":"' + FAKE_USER_ID.encode() + b'"}'
 
 
 def test_create_user_no_body(client, monkeypatch):
     """Test POST /users/ with no body uses AuthenticationDep and returns 201."""
-    fake_id = str(uuid.uuid4())
-
-    class FakeAuth:
-        subject = "testsub"
-        issuer = "https://issuer.example.com"
-
-        def __init__(self):
-            self.user_info = {"name": "Test User", "email": "test@example.com"}
-
-    def retrieve_info_from_fake_token(authz_creds=None):
-        return FakeAuth()
-
-    class FakeUser:
-        id = fake_id
+    received = []
 
     def fake_add_user(session, user):
-        return FakeUser()
+        received.append(user)
+        return FAKE_USER
 
     # Patch AuthenticationDep to return our fake auth info
-    sub_app_v1.dependency_overrides[check_authentication] = (
-        retrieve_info_from_fake_token
-    )
+    sub_app_v1.dependency_overrides[check_authentication] = lambda: FAKE_AUTH
 
     monkeypatch.setattr("app.v1.users.endpoints.add_user", fake_add_user)
 
     resp = client.post("/api/v1/users/")
     assert resp.status_code == 201
-    assert resp.json() == {"id": fake_id}
-
-
-def test_create_user_conflict(client, monkeypatch):
-    """Test POST /users/ returns 409 if user already exists."""
-    user_data = {
-        "sub": "testsub",
-        "name": "Test User",
-        "email": "test@example.com",
-        "issuer": "https://issuer.example.com",
-    }
+    assert resp.content == b'{"id":"' + FAKE_USER_ID.encode() + b'"}'
+    assert isinstance(received[0], UserCreate)
+    assert received[0].sub == "testsub"
+    assert str(received[0].issuer) == "https://issuer.example.com/"
+
+
+@pytest.mark.parametrize(
+    "user_info",
+    [
+        {"name": "Test User"},
+        {"email": "test@example.com"},
+        {},
+        {"name": "Test User", "email": "not-an-email"},
+    ],
+    ids=["no-email", "no-name", "no-claims", "invalid-email"],
+)
+def test_create_user_no_body_invalid_claims(client, monkeypatch, user_info):
+    """Test POST /users/ with no body returns 422 on missing or invalid name or email.
+
+    With offline JWT validation the user information are only the access token claims.
+    """
+    auth = SimpleNamespace(
+        subject="testsub", issuer="https://issuer.example.com", user_info=user_info
+    )
+    sub_app_v1.dependency_overrides[check_authentication] = lambda: auth
+    add_user = MagicMock()
+    monkeypatch.setattr("app.v1.users.endpoints.add_user", add_user)
 
-    def fake_add_user(session, user):
-        raise ConflictError("User already exists")
+    resp = client.post("/api/v1/users/")
+    assert resp.status_code == 422
+    assert "provide them in the request body" in resp.json()["detail"]
+    add_user.assert_not_called()
 
-    monkeypatch.setattr("app.v1.users.endpoints.add_user", fake_add_user)
-    resp = client.post("/api/v1/users/", json=user_data)
-    assert resp.status_code == 409
-    assert resp.json()["detail"] == "User already exists"
 
-
-def test_create_user_not_null(client, monkeypatch):
-    """Test POST /users/ returns 422 if user if creation triggers a not null error."""
-    user_data = {
-        "sub": "testsub",
-        "name": "Test User",
-        "email": "test@example.com",
-        "issuer": "https://issuer.example.com",
-    }
+@pytest.mark.parametrize(
+    "exc,status,msg",
+    [
+        (ConflictError("User already exists"), 409, "User already exists"),
+        (NotNullError("Field 'email' cannot be null"), 422, "cannot be null"),
+    ],
+    ids=["conflict", "not_null"],
+)
+def test_create_user_error(client, monkeypatch, exc, status, msg):
+    """Test POST /users/ maps the user creation errors to the HTTP status."""
 
     def fake_add_user(session, user):
-        raise NotNullError("Field 'email' cannot be null")
+        raise exc
 
     monkeypatch.setattr("app.v1.users.endpoints.add_user", fake_add_user)
-    resp = client.post("/api/v1/users/", json=user_data)
-    assert resp.status_code == 422
-    assert "cannot be null" in resp.json()["detail"]
+    resp = client.post("/api/v1/users/", content=USER_DATA_JSON, headers=JSON_HEADERS)
+    assert resp.status_code == status
+    assert msg in resp.json()["detail"]
 
 
 def test_get_users_success(client, monkeypatch):
@@ -124,34 +157,66 @@ def test_get_users_success(client, monkeypatch):
     monkeypatch.setattr("app.v1.users.endpoints.get_users", fake_get_users)
     resp = client.get("/api/v1/users/")
     assert resp.status_code == 200
-    assert "data" in resp.json()
+    assert b'"data":' in resp.content
+    etag = resp.headers["ETag"]
+
+    resp = client.get("/api/v1/users/", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def test_get_users_filters(client, monkeypatch):
+    """Test GET /users/ forwards only the given filters to get_users."""
+    received = {}
+
+    def fake_get_users(session, skip, limit, sort, **kwargs):
+        received.update(kwargs)
+        return [], 0
+
+    monkeypatch.setattr("app.v1.users.endpoints.get_users", fake_get_users)
+    resp = client.get("/api/v1/users/", params={"name": "Jo", "page": 2, "size": 5})
+    assert resp.status_code == 200
+    assert received == {"name": "Jo"}
 
 
 def test_get_user_success(client, monkeypatch):
     """Test GET /users/{user_id} returns user if found."""
-    fake_id = str(uuid.uuid4())
-
-    class FakeUser:
-        id = fake_id
-        sub = "testsub"
-        name = "Test User"
-        email = "test@example.com"
-        issuer = "https://issuer.example.com"
-        created_at = "2024-01-01T00:00:00Z"
+    fake_id = FAKE_USER_ID
+    fake_user = User.model_validate(
+        {
+            "id": fake_id,
+            "sub": "testsub",
+            "name": "Test User",
+            "email": "test@example.com",
+            "issuer": "https://issuer.example.com",
+            "created_at": "2024-01-01T00:00:00Z",
+        }
+    )
 
     def fake_get_user(user_id, session=None):
-        return FakeUser()
+        return fake_user
 
     sub_app_v1.dependency_overrides[get_user] = fake_get_user
 
     resp = client.get(f"/api/v1/users/{fake_id}")
     assert resp.status_code == 200
     assert resp.json()["id"] == fake_id
+    assert resp.headers["Cache-Control"] == "private, no-cache"
+    etag = resp.headers["ETag"]
+
+    resp = client.get(f"/api/v1/users/{fake_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["ETag"] == etag
+
+    fake_user.name = "New Name"
+    resp = client.get(f"/api/v1/users/{fake_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
 
 
 def test_get_user_not_found(client, monkeypatch):
     """Test GET /users/{user_id} returns 404 if user not found."""
-    fake_id = str(uuid.uuid4())
+    fake_id = FAKE_USER_ID
 
     def fake_get_user(user_id, session=None):
         return None
@@ -163,86 +228,44 @@ def test_get_user_not_found(client, monkeypatch):
     assert resp.json()["detail"] == f"User with ID '{fake_id}' does not exist"
 
 
-def test_delete_user_success(client, monkeypatch):
-    """Test DELETE /users/{user_id} returns 204 on success."""
-    fake_id = str(uuid.uuid4())
+@pytest.mark.parametrize(
+    "method,crud_function,body",
+    [("DELETE", "delete_user", None), ("PUT", "update_user", USER_DATA_JSON)],
+    ids=["delete", "edit"],
+)
+def test_change_user_success(client, monkeypatch, method, crud_function, body):
+    """Test DELETE and PUT /users/{user_id} return 204 on success."""
     monkeypatch.setattr(
-        "app.v1.users.endpoints.delete_user", lambda session, user_id: None
+        f"app.v1.users.endpoints.{crud_function}", lambda **kwargs: None
+    )
+    resp = client.request(
+        method,
+        f"/api/v1/users/{FAKE_USER_ID}",
+        content=body,
+        headers=JSON_HEADERS,
     )
-    resp = client.delete(f"/api/v1/users/{fake_id}")
-    assert resp.status_code == 204
-
-
-def test_edit_user_success(client, monkeypatch):
-    """Test PUT /users/{user_id} returns 204 on successful update."""
-    fake_id = str(uuid.uuid4())
-    user_data = {
-        "sub": "testsub",
-        "name": "Test User",
-        "email": "test@example.com",
-        "issuer": "https://issuer.example.com",
-    }
-
-    def fake_update_user(session, user_id, new_user):
-        return None
-
-    monkeypatch.setattr("app.v1.users.endpoints.update_user", fake_update_user)
-    resp = client.put(f"/api/v1/users/{fake_id}", json=user_data)
     assert resp.status_code == 204
 
 
-def test_edit_user_not_found(client, monkeypatch):
-    """Test PUT /users/{user_id} returns 404 if user does not exist."""
-    fake_id = str(uuid.uuid4())
-    user_data = {
-        "sub": "testsub",
-        "name": "Test User",
-        "email": "test@example.com",
-        "issuer": "https://issuer.example.com",
-    }
+@pytest.mark.parametrize(
+    "exc,status,msg",
+    [
+        (NoItemToUpdateError("User not found"), 404, "User not found"),
+        (ConflictError("User already exists"), 409, "User already exists"),
+        (NotNullError("Field 'email' cannot be null"), 422, "cannot be null"),
+    ],
+    ids=["not_found", "conflict", "not_null"],
+)
+def test_edit_user_error(client, monkeypatch, exc, status, msg):
+    """Test PUT /users/{user_id} maps the user update errors to the HTTP status."""
+    fake_id = FAKE_USER_ID
 
     def fake_update_user(session, user_id, new_user):
-        raise NoItemToUpdateError("User not found")
+        raise exc
 
     monkeypatch.setattr("app.v1.users.endpoints.update_user", fake_update_user)
-    resp = client.put(f"/api/v1/users/{fake_id}", json=user_data)
-    assert resp.status_code == 404
-    assert resp.json()["detail"] == "User not found"
-
-
-def test_edit_user_conflict_error(client, monkeypatch):
-    """Test PUT /users/{user_id} returns 409 if update triggers a conflict error."""
-    fake_id = str(uuid.uuid4())
-    user_data = {
-        "sub": "testsub",
-        "name": "Test User",
-        "email": "test@example.com",
-        "issuer": "https://issuer.example.com",
-    }
-
-    def fake_update_user(session, user_id, new_user):
-        raise ConflictError("User already exists")
-
-    monkeypatch.setattr("app.v1.users.endpoints.update_user", fake_update_user)
-    resp = client.put(f"/api/v1/users/{fake_id}", json=user_data)
-    assert resp.status_code == 409
-    assert resp.json()["detail"] == "User already exists"
-
-
-def test_edit_user_not_null_error(client, monkeypatch):
-    """Test PUT /users/{user_id} returns 422 if update triggers a not null error."""
-    fake_id = str(uuid.uuid4())
-    user_data = {
-        "sub": "testsub",
-        "name": "Test User",
-        "email": "test@example.com",
-        "issuer": "https://issuer.example.com",
-    }
-
-    def fake_update_user(session, user_id, new_user):
-        raise NotNullError("Field 'email' cannot be null")
-
-    monkeypatch.setattr("app.v1.users.endpoints.update_user", fake_update_user)
-    resp = client.put(f"/api/v1/users/{fake_id}", json=user_data)
-    assert resp.status_code == 422
-    assert "cannot be null" in resp.json()["detail"]
+    resp = client.put(
+        f"/api/v1/users/{fake_id}", content=USER_DATA_JSON, headers=JSON_HEADERS
+    )
+    assert resp.status_code == status
+    assert msg in resp.json()["detail"]
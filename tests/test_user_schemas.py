@@ -1,18 +1,19 @@
 """Unit tests for the user Pydantic schemas in app.v1.users.schemas module.
 
 This test suite covers:
-- Validation of the UserBase schema, including correct and incorrect email and issuer
-  values.
+- Validation of the UserBase schema, including correct and incorrect issuer values.
+- Email format validation in the UserCreate schema.
 - Inheritance and field presence in the User model, including the created_at timestamp.
+- Column order of the User (sub, issuer) unique constraint.
 - UserCreate schema validation and its inheritance from UserBase.
 - Default values and value assignment in the UserQuery schema.
 - Construction and field validation of the UserList schema, including correct
   aggregation of User instances.
 
 Tested Schemas:
-- UserBase: Basic user information with validation for email and issuer fields.
+- UserBase: Basic user information with validation for the issuer field.
 - User: Extends UserBase with additional fields such as id and created_at.
-- UserCreate: Used for user creation, inherits from UserBase.
+- UserCreate: Used for user creation, inherits from UserBase and validates the email.
 - UserQuery: Used for querying users, supports optional filtering fields.
 - UserList: Represents a paginated list of users.
 
@@ -39,6 +40,10 @@ DUMMY_NAME = "John Doe"
 DUMMY_EMAIL = "john.doe@example.com"
 DUMMY_ISSUER = "https://issuer.example.com"
 DUMMY_URL = "https://app.example.com/users/"
+DUMMY_ID = uuid.UUID("00000000-0000-4000-8000-000000000001")
+DUMMY_DT = datetime(2024, 1, 1)
+DUMMY_ISSUER_URL = AnyHttpUrl(DUMMY_ISSUER)
+DUMMY_RESOURCE_URL = AnyHttpUrl("https://api.com/users")
 
 
 def test_user_base_valid():
@@ -55,33 +60,42 @@ def test_user_base_valid():
     assert user.sub == DUMMY_SUB
     assert user.name == DUMMY_NAME
     assert user.email == DUMMY_EMAIL
-    assert user.issuer == AnyHttpUrl(DUMMY_ISSUER)
+    assert user.issuer == DUMMY_ISSUER_URL
 
 
-@pytest.mark.parametrize("email", ["not-an-email", "missingatsign.com", "user@.com"])
-def test_user_base_invalid_email(email):
-    """Test that UserBase raises ValidationError for invalid email values."""
+@pytest.mark.parametrize(
+    "email",
+    ["not-an-email", "missingatsign.com", "user@.com"],
+    ids=["plain-text", "no-at-sign", "empty-domain"],
+)
+def test_user_create_invalid_email(email):
+    """Test that UserCreate raises ValidationError for invalid email values."""
     with pytest.raises(ValidationError):
-        UserBase(
-            sub=DUMMY_SUB,
-            name=DUMMY_NAME,
-            email=email,
-            issuer=DUMMY_ISSUER,
+        UserCreate.__pydantic_validator__.validate_python(
+            {
+                "sub": DUMMY_SUB,
+                "name": DUMMY_NAME,
+                "email": email,
+                "issuer": DUMMY_ISSUER,
+            }
         )
 
 
 @pytest.mark.parametrize(
     "issuer",
     ["not-a-url", "ftp://nothttp.com"],  # "http:/broken.com" does not raise error
+    ids=["no-scheme", "ftp-scheme"],
 )
 def test_user_base_invalid_issuer(issuer):
     """Test that UserBase raises ValidationError for invalid issuer values."""
     with pytest.raises(ValidationError):
-        UserBase(
-            sub=DUMMY_SUB,
-            name=DUMMY_NAME,
-            email=DUMMY_EMAIL,
-            issuer=issuer,
+        UserBase.__pydantic_validator__.validate_python(
+            {
+                "sub": DUMMY_SUB,
+                "name": DUMMY_NAME,
+                "email": DUMMY_EMAIL,
+                "issuer": issuer,
+            }
         )
 
 
@@ -96,7 +110,7 @@ def test_user_model_inherits_and_has_created_at():
         name=DUMMY_NAME,
         email=DUMMY_EMAIL,
         issuer=DUMMY_ISSUER,
-        created_at=datetime.now(),
+        created_at=DUMMY_DT,
     )
     assert user.id == 1
     assert user.sub == DUMMY_SUB
@@ -138,21 +152,36 @@ def test_user_query_with_values():
 
 
 def test_user_list_data_field():
-    """Test UserList data field contains list of User."""
+    """Test UserList data field contains list of User.
+
+    The list is built with model_construct, as the endpoints do with users read from
+    the DB, so the pagination details must not depend on validation.
+    """
     user = User(
-        id=uuid.uuid4(),
+        id=DUMMY_ID,
         sub=DUMMY_SUB,
         name=DUMMY_NAME,
         email=DUMMY_EMAIL,
         issuer=DUMMY_ISSUER,
-        created_at=datetime.now(),
+        created_at=DUMMY_DT,
     )
-    user_list = UserList(
+    user_list = UserList.model_construct(
         data=[user],
         page_number=1,
         page_size=1,
         tot_items=1,
-        resource_url=AnyHttpUrl("https://api.com/users"),
+        resource_url=DUMMY_RESOURCE_URL,
     )
     assert isinstance(user_list.data, list)
     assert user_list.data[0].sub == DUMMY_SUB
+    assert user_list.page.total_elements == 1
+
+
+def test_user_unique_sub_issuer_constraint_order():
+    """Test the (sub, issuer) unique constraint leads with the subject.
+
+    The constraint's implicit index backs the lookups by subject and issuer.
+    """
+    constraints = {c.name: c for c in User.__table__.constraints}
+    columns = [c.name for c in constraints["unique_sub_issuer_couple"].columns]
+    assert columns == ["sub", "issuer"]
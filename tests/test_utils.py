@@ -2,17 +2,43 @@
 
 These tests cover:
 - add_allow_header_to_resp header setting
+- get_allow_header sorting and caching
+- build_etag_response ETag computation, response model filtering and If-None-Match
+  handling
 - split_came_case
 """
 
+import hashlib
+from unittest.mock import MagicMock
+
 import pytest
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.utils import (
+    add_allow_header_to_resp,
+    build_etag_response,
+    get_allow_header,
+    split_camel_case,
+)
 
-from app.utils import add_allow_header_to_resp, split_camel_case
 
+class DummyModel(BaseModel):
+    """Dummy model returned by build_etag_response."""
 
-def test_add_allow_header_to_resp_sets_methods():
-    """Set the Allow header with available HTTP methods."""
+    name: str
+
+
+class DummyModelWithSecret(DummyModel):
+    """Dummy model with a field not declared by DummyModel."""
+
+    secret: str
+
+
+@pytest.fixture(scope="module")
+def two_method_router():
+    """Return a router with a GET and a POST route, built once for the module."""
     router = APIRouter()
 
     @router.get("/")
@@ -25,12 +51,101 @@ def test_add_allow_header_to_resp_sets_methods():
         """Return a dummy POST response."""
         return "ok"
 
+    return router
+
+
+def test_add_allow_header_to_resp_sets_methods(two_method_router):
+    """Set the Allow header with available HTTP methods."""
     response = Response()
-    add_allow_header_to_resp(router, response)
+    add_allow_header_to_resp(two_method_router, response)
     allow = response.headers.get("Allow")
     assert allow is not None
-    assert "GET" in allow
-    assert "POST" in allow
+    methods = {m.strip() for m in allow.split(",")}
+    assert {"GET", "POST"} <= methods
+
+
+def test_get_allow_header_sorted_and_cached():
+    """Build the Allow header once per router with sorted methods."""
+    router = APIRouter()
+
+    @router.put("/")
+    def dummy_put():
+        """Return a dummy PUT response."""
+        return "ok"
+
+    @router.delete("/")
+    def dummy_delete():
+        """Return a dummy DELETE response."""
+        return "ok"
+
+    allow = get_allow_header(router)
+    assert allow == "DELETE, PUT"
+    assert get_allow_header(router) is allow
+
+
+def test_build_etag_response():
+    """Return the serialized content with an ETag depending on the content."""
+    request = MagicMock(headers={})
+    resp = build_etag_response(request, DummyModel(name="foo"), DummyModel)
+    assert resp.status_code == 200
+    assert resp.body == b'{"name":"foo"}'
+    assert resp.headers["Cache-Control"] == "private, no-cache"
+    etag = resp.headers["ETag"]
+    assert (
+        build_etag_response(request, DummyModel(name="foo"), DummyModel).headers["ETag"]
+        == etag
+    )
+    assert (
+        build_etag_response(request, DummyModel(name="bar"), DummyModel).headers["ETag"]
+        != etag
+    )
+
+
+def test_build_etag_response_filters_undeclared_fields():
+    """Serialize and hash only the fields declared by the given model."""
+    request = MagicMock(headers={})
+    resp = build_etag_response(
+        request, DummyModelWithSecret(name="foo", secret="bar"), DummyModel
+    )
+    assert resp.body == b'{"name":"foo"}'
+    expected = build_etag_response(request, DummyModel(name="foo"), DummyModel)
+    assert resp.headers["ETag"] == expected.headers["ETag"]
+
+
+def test_build_etag_response_route_response_model():
+    """Keep the fields excluded by the route response_model out of the response."""
+    app = FastAPI()
+
+    @app.get("/", response_model=DummyModel)
+    def dummy(request: Request) -> Response:
+        """Return a model with a field not declared by the response model."""
+        content = DummyModelWithSecret(name="foo", secret="bar")
+        return build_etag_response(request, content, DummyModel)
+
+    client = TestClient(app)
+    resp = client.get("/")
+    assert resp.content == b'{"name":"foo"}'
+    etag = resp.headers["ETag"]
+    assert etag == f'"{hashlib.blake2b(resp.content, digest_size=16).hexdigest()}"'
+    resp = client.get("/", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+
+@pytest.mark.parametrize(
+    "if_none_match,status_code",
+    [("{etag}", 304), ('"other", W/{etag}', 304), ("*", 304), ('"other"', 200)],
+)
+def test_build_etag_response_if_none_match(if_none_match, status_code):
+    """Return 304 without body when the If-None-Match header matches the ETag."""
+    etag = build_etag_response(
+        MagicMock(headers={}), DummyModel(name="foo"), DummyModel
+    ).headers["ETag"]
+    request = MagicMock(headers={"if-none-match": if_none_match.format(etag=etag)})
+    resp = build_etag_response(request, DummyModel(name="foo"), DummyModel)
+    assert resp.status_code == status_code
+    assert resp.headers["ETag"] == etag
+    assert (resp.body == b"") is (status_code == 304)
 
 
 @pytest.mark.parametrize(